@@ -1,43 +1,58 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import atexit
 import logging
 import os
-import yaml
+import queue
+import re
+import time
 from datetime import datetime
-from logging.handlers import RotatingFileHandler
-from typing import Optional, Dict, Any
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+from typing import Optional, Dict, Any, List
 from pathlib import Path
 import json
 from pythonjsonlogger import jsonlogger
 
-from config.settings import Settings
+from config.settings import settings
+
+# ハンドラーの設定済みフラグ（プロセス内で一度だけ設定する）
+_initialized = False
+
+# 再利用するログエントリ辞書の最大保持数
+_ENTRY_POOL_SIZE = 64
+
+# クォートせずにYAMLのキーとして書けるパターン
+_PLAIN_YAML_KEY = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+def _yaml_quote(value: Any) -> str:
+    """値をYAMLのスカラーとして書き出せる文字列に変換（JSON表現はYAMLとしても有効）"""
+    return json.dumps(value, ensure_ascii=False, default=str)
 
 class Logger:
     """アプリケーションのロギングを管理するクラス"""
     
-    _instance: Optional['Logger'] = None
     _logger: Optional[logging.Logger] = None
-
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
+    _listener: Optional[QueueListener] = None
+    _entry_pool: 'queue.SimpleQueue[Dict[str, Any]]' = queue.SimpleQueue()
 
     def __init__(self):
         """Loggerの初期化"""
-        if self._logger is None:
-            self.settings = Settings()
+        global _initialized
+        self.settings = settings
+        if not _initialized:
+            _initialized = True
             self._setup_logger()
 
     def _setup_logger(self):
         """ロガーの初期設定"""
-        self._logger = logging.getLogger('app')
+        Logger._logger = logging.getLogger('app')
         self._logger.setLevel(self.settings.LOGGING_CONFIG['level'])
 
         # 既存のハンドラをクリア
         if self._logger.handlers:
             self._logger.handlers.clear()
+        handlers = []
 
         # ログディレクトリの作成
         log_dir = Path(self.settings.LOGGING_CONFIG['log_dir'])
@@ -52,14 +67,14 @@ class Logger:
         )
 
         # JSONファイルハンドラー
-        json_handler = RotatingFileHandler(
+        json_handler = FastRotatingFileHandler(
             log_dir / 'app.json.log',
             maxBytes=self.settings.LOGGING_CONFIG['max_bytes'],
             backupCount=self.settings.LOGGING_CONFIG['backup_count'],
             encoding='utf-8'
         )
         json_handler.setFormatter(json_formatter)
-        self._logger.addHandler(json_handler)
+        handlers.append(json_handler)
 
         # YAMLファイルハンドラー
         yaml_handler = YAMLRotatingFileHandler(
@@ -67,23 +82,43 @@ class Logger:
             maxBytes=self.settings.LOGGING_CONFIG['max_bytes'],
             backupCount=self.settings.LOGGING_CONFIG['backup_count']
         )
-        self._logger.addHandler(yaml_handler)
+        handlers.append(yaml_handler)
 
         # テキストファイルハンドラー
-        text_handler = RotatingFileHandler(
+        text_handler = FastRotatingFileHandler(
             log_dir / 'app.log',
             maxBytes=self.settings.LOGGING_CONFIG['max_bytes'],
             backupCount=self.settings.LOGGING_CONFIG['backup_count'],
             encoding='utf-8'
         )
         text_handler.setFormatter(text_formatter)
-        self._logger.addHandler(text_handler)
+        handlers.append(text_handler)
 
         # コンソールハンドラー
         if self.settings.LOGGING_CONFIG['console_output']:
             console_handler = logging.StreamHandler()
             console_handler.setFormatter(text_formatter)
-            self._logger.addHandler(console_handler)
+            handlers.append(console_handler)
+
+        # タイムスタンプの整形は出力されるレコードに対してのみ行う
+        timestamp_filter = LogTimestampFilter()
+        for handler in handlers:
+            handler.addFilter(timestamp_filter)
+
+        # 書き込みはリスナースレッドに任せ、呼び出し側はキューへの投入のみ行う
+        log_queue = queue.SimpleQueue()
+        self._logger.addHandler(QueueHandler(log_queue))
+        Logger._listener = FlushingQueueListener(log_queue, *handlers, respect_handler_level=True)
+        self._listener.start()
+        atexit.register(self.close)
+
+    def close(self):
+        """リスナーを停止し、キューに残っているログを書き出す"""
+        if self._listener is not None:
+            self._listener.stop()
+            for handler in self._listener.handlers:
+                handler.close()
+            Logger._listener = None
 
     def _create_json_formatter(self) -> jsonlogger.JsonFormatter:
         """JSONフォーマッターを作成"""
@@ -94,33 +129,61 @@ class Logger:
         )
 
     def _create_log_entry(self, level: str, message: str, **kwargs) -> Dict[str, Any]:
-        """ログエントリを作成"""
-        return {
-            'log_timestamp': datetime.now().isoformat(),
-            'log_level': level,
-            'log_source': 'app',
-            **kwargs
-        }
+        """ログエントリを作成（プールに返却済みの辞書があれば再利用）"""
+        try:
+            entry = self._entry_pool.get_nowait()
+        except queue.Empty:
+            entry = {}
+        entry['log_timestamp'] = None  # 出力時にLogTimestampFilterが設定
+        entry['log_level'] = level
+        entry['log_source'] = 'app'
+        entry.update(kwargs)
+        return entry
+
+    def _release_log_entry(self, entry: Dict[str, Any]):
+        """
+        ログエントリをプールに返却
+
+        extraの値はLogRecordの属性にコピー済みのため、ログ呼び出し後は再利用できる
+        """
+        entry.clear()
+        if self._entry_pool.qsize() < _ENTRY_POOL_SIZE:
+            self._entry_pool.put(entry)
 
     def debug(self, message: str, **kwargs):
         """デバッグレベルのログを出力"""
-        self._logger.debug(message, extra=self._create_log_entry('DEBUG', message, **kwargs))
+        if self._logger.isEnabledFor(logging.DEBUG):
+            entry = self._create_log_entry('DEBUG', message, **kwargs)
+            self._logger.debug(message, extra=entry)
+            self._release_log_entry(entry)
 
     def info(self, message: str, **kwargs):
         """情報レベルのログを出力"""
-        self._logger.info(message, extra=self._create_log_entry('INFO', message, **kwargs))
+        if self._logger.isEnabledFor(logging.INFO):
+            entry = self._create_log_entry('INFO', message, **kwargs)
+            self._logger.info(message, extra=entry)
+            self._release_log_entry(entry)
 
     def warning(self, message: str, **kwargs):
         """警告レベルのログを出力"""
-        self._logger.warning(message, extra=self._create_log_entry('WARNING', message, **kwargs))
+        if self._logger.isEnabledFor(logging.WARNING):
+            entry = self._create_log_entry('WARNING', message, **kwargs)
+            self._logger.warning(message, extra=entry)
+            self._release_log_entry(entry)
 
     def error(self, message: str, **kwargs):
         """エラーレベルのログを出力"""
-        self._logger.error(message, extra=self._create_log_entry('ERROR', message, **kwargs))
+        if self._logger.isEnabledFor(logging.ERROR):
+            entry = self._create_log_entry('ERROR', message, **kwargs)
+            self._logger.error(message, extra=entry)
+            self._release_log_entry(entry)
 
     def critical(self, message: str, **kwargs):
         """重大エラーレベルのログを出力"""
-        self._logger.critical(message, extra=self._create_log_entry('CRITICAL', message, **kwargs))
+        if self._logger.isEnabledFor(logging.CRITICAL):
+            entry = self._create_log_entry('CRITICAL', message, **kwargs)
+            self._logger.critical(message, extra=entry)
+            self._release_log_entry(entry)
 
     def set_level(self, level: str):
         """ログレベルを動的に設定"""
@@ -134,44 +197,221 @@ class Logger:
         if level.upper() in level_map:
             self._logger.setLevel(level_map[level.upper()])
 
-class YAMLRotatingFileHandler(RotatingFileHandler):
-    """YAML形式でログを出力するRotatingFileHandler"""
+class LogTimestampFilter(logging.Filter):
+    """出力されるレコードにのみISO形式のlog_timestampを設定するフィルター"""
+
+    def filter(self, record) -> bool:
+        if getattr(record, 'log_timestamp', None) is None:
+            record.log_timestamp = datetime.fromtimestamp(record.created).isoformat()
+        return True
+
+class FastRotatingFileHandler(RotatingFileHandler):
+    """ファイルサイズをメモリ上で管理し、emitごとのstat/seek/tellを省くRotatingFileHandler"""
+
+    def __init__(self, *args, buffer_size: int = 64 * 1024,
+                 sync_interval: float = 0.2, **kwargs):
+        """
+        初期化
+
+        Args:
+            buffer_size: ストリームの書き込みバッファサイズ（バイト）
+            sync_interval: バッファをディスクへ書き出す最短間隔（秒）
+        """
+        self._current_size = 0
+        self._is_regular_file = True
+        self._buffer_size = buffer_size
+        self._sync_interval = sync_interval
+        self._last_sync = time.monotonic()
+        super().__init__(*args, **kwargs)
+
+    def _open(self):
+        """バッファ付きでファイルを開き、種別と現在のサイズを一度だけ取得"""
+        stream = open(
+            self.baseFilename,
+            self.mode,
+            buffering=self._buffer_size,
+            encoding=self.encoding,
+            errors=self.errors
+        )
+        # 通常ファイル以外（/dev/null等）はローテーションしない（bpo-45401）
+        self._is_regular_file = os.path.isfile(self.baseFilename)
+        self._current_size = os.path.getsize(self.baseFilename) if self._is_regular_file else 0
+        return stream
+
+    def _encoded_size(self, text: str) -> int:
+        """書き込み時のバイト数を計算"""
+        return len(text.encode(self.encoding or 'utf-8', errors='replace'))
+
+    def _would_overflow(self, size: int) -> bool:
+        """sizeバイト書き込むと上限を超えるかどうか"""
+        return (self._is_regular_file and self.maxBytes > 0
+                and self._current_size + size >= self.maxBytes)
+
+    def shouldRollover(self, record) -> bool:
+        """メモリ上のサイズでローテーションの要否を判定"""
+        if self.stream is None:
+            self.stream = self._open()
+        return self._would_overflow(self._encoded_size("%s\n" % self.format(record)))
 
     def emit(self, record):
-        """ログレコードを出力"""
+        """ログレコードを出力し、書き込んだバイト数を加算"""
         try:
+            # フォーマットは1回だけ行い、サイズ判定と書き込みで共有する
+            msg = self.format(record) + self.terminator
+            size = self._encoded_size(msg)
             if self.stream is None:
                 self.stream = self._open()
+            if self._would_overflow(size):
+                self.doRollover()
+                if self.stream is None:
+                    self.stream = self._open()
+            self.stream.write(msg)
+            self.flush()
+            self._current_size += size
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def doRollover(self):
+        """ローテーション後にサイズをリセット"""
+        super().doRollover()
+        if self.stream is None:
+            self._current_size = 0
 
-            # ログエントリの作成
-            log_entry = {
-                'timestamp': datetime.fromtimestamp(record.created).isoformat(),
-                'level': record.levelname,
-                'logger': record.name,
-                'message': record.getMessage()
-            }
+    def flush(self):
+        """レコードごとには書き出さず、一定間隔を過ぎた場合のみフラッシュ"""
+        if time.monotonic() - self._last_sync >= self._sync_interval:
+            self._sync_stream()
+
+    def flush_buffer(self):
+        """バッファの内容をディスクへ書き出す"""
+        self._sync_stream()
+
+    def _sync_stream(self):
+        """ストリームのバッファをフラッシュ"""
+        self.acquire()
+        try:
+            if self.stream and hasattr(self.stream, 'flush'):
+                self.stream.flush()
+            self._last_sync = time.monotonic()
+        finally:
+            self.release()
+
+class FlushingQueueListener(QueueListener):
+    """キューが一定時間空いた時点でハンドラーのバッファを書き出すQueueListener"""
+
+    def __init__(self, log_queue, *handlers, flush_interval: float = 0.2,
+                 respect_handler_level: bool = False):
+        super().__init__(log_queue, *handlers, respect_handler_level=respect_handler_level)
+        self.flush_interval = flush_interval
+
+    def dequeue(self, block):
+        """レコードを取り出す。待機中にタイムアウトしたらバッファを書き出す"""
+        while True:
+            try:
+                return self.queue.get(block, self.flush_interval)
+            except queue.Empty:
+                if not block:
+                    raise
+                self.flush_handlers()
+
+    def flush_handlers(self):
+        """全ハンドラーのバッファを書き出す"""
+        for handler in self.handlers:
+            getattr(handler, 'flush_buffer', handler.flush)()
+
+class YAMLRotatingFileHandler(FastRotatingFileHandler):
+    """YAML形式でログを出力するRotatingFileHandler"""
+
+    def __init__(self, *args, flush_threshold: int = 64 * 1024,
+                 flush_interval: float = 1.0, **kwargs):
+        """
+        初期化
+
+        Args:
+            flush_threshold: バッファをまとめて書き出すメッセージ量（バイト）
+            flush_interval: 前回の書き出しからの最大待機時間（秒）
+        """
+        super().__init__(*args, **kwargs)
+        self._buf: List[str] = []
+        self._buf_bytes = 0
+        self._flush_threshold = flush_threshold
+        self._flush_interval = flush_interval
+        self._last_flush = time.monotonic()
+
+    def emit(self, record):
+        """ログレコードをバッファに追加し、閾値を超えたらまとめて出力"""
+        try:
+            message = record.getMessage()
+
+            # ログエントリの作成（固定スキーマのためyaml.dumpを使わずに組み立てる）
+            lines = [
+                f"- timestamp: {_yaml_quote(datetime.fromtimestamp(record.created).isoformat())}\n",
+                f"  level: {record.levelname}\n",
+                f"  logger: {_yaml_quote(record.name)}\n",
+                f"  message: {_yaml_quote(message)}\n"
+            ]
 
             # 追加の属性を含める
             if hasattr(record, 'extra'):
                 for key, value in record.extra.items():
                     if key not in ['timestamp', 'level', 'logger', 'message']:
-                        log_entry[key] = value
-
-            # YAMLとして書き出し
-            yaml.dump(
-                [log_entry],
-                self.stream,
-                allow_unicode=True,
-                default_flow_style=False,
-                sort_keys=False
-            )
-            self.stream.write('---\n')  # エントリ区切り
-            
-            self.flush()
-            
+                        key = key if _PLAIN_YAML_KEY.match(key) else _yaml_quote(key)
+                        lines.append(f"  {key}: {_yaml_quote(value)}\n")
+
+            self._buf.append(''.join(lines))
+            self._buf_bytes += len(message)
+
+            if (self._buf_bytes >= self._flush_threshold
+                    or time.monotonic() - self._last_flush > self._flush_interval):
+                self._flush_batch()
+
         except Exception:
             self.handleError(record)
 
+    def _flush_batch(self):
+        """バッファ内のエントリを1つのYAMLドキュメントとして書き出す"""
+        if self._buf:
+            if self.stream is None:
+                self.stream = self._open()
+
+            text = ''.join(self._buf) + '---\n'  # エントリ区切り
+            self.stream.write(text)
+            self.flush()
+
+            self._buf.clear()
+            self._buf_bytes = 0
+
+            # tell()を使わず、書き込んだバイト数でサイズを管理
+            self._current_size += self._encoded_size(text)
+            if self._would_overflow(0):
+                self.doRollover()
+        self._last_flush = time.monotonic()
+
+    def doRollover(self):
+        """ローテーション前にバッファを書き出す"""
+        self._flush_batch()
+        super().doRollover()
+
+    def flush_buffer(self):
+        """未出力のエントリも含めてディスクへ書き出す"""
+        self.acquire()
+        try:
+            self._flush_batch()
+        finally:
+            self.release()
+        self._sync_stream()
+
+    def close(self):
+        """クローズ前にバッファを書き出す"""
+        self.acquire()
+        try:
+            self._flush_batch()
+        finally:
+            self.release()
+        super().close()
+
 # シングルトンインスタンスを作成
 logger = Logger()
 
@@ -4,8 +4,8 @@
 import sys
 import os
 import argparse
+import threading
 from typing import Optional, Tuple
-from pathlib import Path
 from tqdm import tqdm
 import asyncio
 
@@ -15,15 +15,40 @@ sys.path.insert(0, src_path)
 
 from app.site_saver import SiteSaver
 from app.system_saver import SystemSaver
-from app.logger import Logger
-from config.settings import Settings
+from app.logger import get_logger
+from config.settings import settings
 
 class Application:
     def __init__(self):
-        self.logger = Logger()
-        self.settings = Settings()
+        self.logger = get_logger()
+        self.settings = settings
         self.site_saver = SiteSaver(self.logger)
         self.system_saver = SystemSaver(self.logger)
+        self._session_warmup: Optional[asyncio.Task] = None
+
+    async def _ainput(self, prompt: str) -> str:
+        """
+        イベントループを止めずに標準入力から1行読み込む
+
+        読み込みはデーモンスレッドで行うため、中断時に終了を妨げない
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def _set(method, value):
+            if not future.done():
+                method(value)
+
+        def _read():
+            try:
+                line = input(prompt)
+            except BaseException as e:
+                loop.call_soon_threadsafe(_set, future.set_exception, e)
+            else:
+                loop.call_soon_threadsafe(_set, future.set_result, line)
+
+        threading.Thread(target=_read, daemon=True).start()
+        return await future
 
     def _validate_url(self, url: str) -> bool:
         """URLの基本的な検証"""
@@ -32,8 +57,7 @@ class Application:
     def _validate_path(self, path: str) -> bool:
         """パスの検証"""
         try:
-            path = Path(path)
-            return path.exists()
+            return os.path.exists(path)
         except Exception:
             return False
 
@@ -42,15 +66,14 @@ class Application:
         if not save_dir:
             return os.getcwd()
 
-        path = Path(save_dir)
         try:
-            path.mkdir(parents=True, exist_ok=True)
-            return str(path)
+            os.makedirs(save_dir, exist_ok=True)
+            return save_dir
         except Exception as e:
             self.logger.error(f"保存先ディレクトリの作成に失敗: {e}")
             return os.getcwd()
 
-    def get_user_input(self) -> Tuple[str, str, str]:
+    async def get_user_input(self) -> Tuple[str, str, str]:
         """
         ユーザーから保存モードと必要な情報を取得
 
@@ -63,7 +86,7 @@ class Application:
         print("q: 終了")
 
         while True:
-            mode = input("\n選択してください (1/2/q): ").strip()
+            mode = (await self._ainput("\n選択してください (1/2/q): ")).strip()
             if mode in ['1', '2', 'q']:
                 break
             print("無効な選択です。もう一度お試しください。")
@@ -71,15 +94,21 @@ class Application:
         if mode == 'q':
             sys.exit(0)
 
+        # 入力を待つ間にHTTPセッションを準備しておく
+        if mode == '1':
+            self._session_warmup = asyncio.create_task(
+                self.site_saver.web_scraper.open_session()
+            )
+
         # 入力パスの取得
         while True:
             if mode == '1':
-                input_path = input("サイトのURLを入力してください: ").strip()
+                input_path = (await self._ainput("サイトのURLを入力してください: ")).strip()
                 if self._validate_url(input_path):
                     break
                 print("無効なURLです。http://またはhttps://で始まるURLを入力してください。")
             else:
-                input_path = input("保存対象のシステムパスを入力してください: ").strip()
+                input_path = (await self._ainput("保存対象のシステムパスを入力してください: ")).strip()
                 if self._validate_path(input_path):
                     break
                 print("無効なパスです。存在するパスを入力してください。")
@@ -90,12 +119,12 @@ class Application:
         print("2: カスタムディレクトリ")
         
         while True:
-            save_dir_choice = input("選択してください (1/2): ").strip()
+            save_dir_choice = (await self._ainput("選択してください (1/2): ")).strip()
             if save_dir_choice == '1':
                 save_dir = os.getcwd()
                 break
             elif save_dir_choice == '2':
-                save_dir = input("保存先ディレクトリのパスを入力: ").strip()
+                save_dir = (await self._ainput("保存先ディレクトリのパスを入力: ")).strip()
                 save_dir = self._setup_save_directory(save_dir)
                 break
             print("無効な選択です。")
@@ -140,13 +169,15 @@ class Application:
 
             # モードと入力の取得
             if args is None or len(args) == 0:
-                mode, input_path, save_dir = self.get_user_input()
+                mode, input_path, save_dir = await self.get_user_input()
             else:
                 mode, input_path, save_dir = self.parse_args(args)
 
             # 進捗表示の準備
             with tqdm(total=100, desc="処理中") as pbar:
                 if mode == 'site':
+                    if self._session_warmup is not None:
+                        await self._session_warmup
                     self.logger.info(f"サイト情報の保存を開始: {input_path}")
                     success = await self.site_saver.save(
                         url=input_path,
@@ -188,7 +219,12 @@ class Application:
         Returns:
             int: 終了コード（0: 成功, 1: エラー）
         """
-        return asyncio.run(self.run_async(args))
+        try:
+            return asyncio.run(self.run_async(args))
+        except KeyboardInterrupt:
+            print("\n処理を中断しました")
+            self.logger.info("ユーザーによって処理が中断されました")
+            return 1
 
 def main():
     """
@@ -2,25 +2,31 @@
 # -*- coding: utf-8 -*-
 
 import os
+import hashlib
 import yaml
 import asyncio
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Optional, List, Any, Tuple, TypeVar, Union, Callable
+from typing import Dict, Optional, List, Any, Tuple, TypeVar, Union, Callable, Set
 from urllib.parse import urljoin, urlparse
 import time
 import psutil
-from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from yaml import CSafeDumper as YAMLDumper
+except ImportError:
+    from yaml import SafeDumper as YAMLDumper
 
 from utils.web_scraper import WebScraper
 from utils.file_manager import FileManager
 from utils.content_processor import ContentProcessor
-from config.settings import Settings
+from config.settings import settings
 
 # 型変数の定義
 T = TypeVar('T')
 ResourceDict = Dict[str, List[Dict[str, str]]]
 StyleDict = Dict[str, str]
+TagDict = Dict[str, List[Any]]
 
 class SiteSaver:
     """サイト情報を保存するためのクラス"""
@@ -33,16 +39,17 @@ class SiteSaver:
             logger: ロガーインスタンス
         """
         self.logger = logger
-        self.settings = Settings()
+        self.settings = settings
         self.web_scraper = WebScraper()
         self.file_manager = FileManager()
         self.content_processor = ContentProcessor()
         self._progress = 0
         self._progress_callback = None
         self._process = psutil.Process()
-        self._executor = ThreadPoolExecutor(
-            max_workers=self.settings.PERFORMANCE['site_saving']['download']['max_concurrent']
-        )
+        self._max_concurrent = self.settings.PERFORMANCE['site_saving']['download']['max_concurrent']
+        self._download_sem: Optional[asyncio.Semaphore] = None
+        self._resources_ok = True
+        self._base_origin: Tuple[str, str] = ('', '')
 
     def _update_progress(self, increment: float):
         """進捗を更新"""
@@ -54,13 +61,12 @@ class SiteSaver:
         """システムリソースをチェック"""
         try:
             # メモリ使用量のチェック
-            memory_info = self._process.memory_info()
-            if memory_info.rss > self.settings.PERFORMANCE['site_saving']['processing']['max_memory_usage']:
+            if self._get_rss() > self.settings.PERFORMANCE['site_saving']['processing']['max_memory_usage']:
                 self.logger.warning("メモリ使用量が制限を超えています")
                 return False
 
-            # CPU使用率のチェック
-            cpu_percent = self._process.cpu_percent()
+            # CPU使用率のチェック（前回呼び出しからの差分）
+            cpu_percent = self._process.cpu_percent(interval=None)
             if cpu_percent > self.settings.PERFORMANCE['site_saving']['processing']['max_cpu_usage']:
                 self.logger.warning("CPU使用率が制限を超えています")
                 return False
@@ -71,6 +77,32 @@ class SiteSaver:
             self.logger.error(f"リソースチェックエラー: {str(e)}")
             return False
 
+    def _get_rss(self) -> int:
+        """
+        プロセスのメモリ使用量（バイト）を取得
+        
+        getrusageのru_maxrssは最大値のため、一度制限を超えると回復しても
+        判定が戻らない。そのため全環境でpsutilの現在値を使う
+        """
+        return self._process.memory_info().rss
+
+    def _get_download_semaphore(self) -> asyncio.Semaphore:
+        """同時ダウンロード数を制限するセマフォを取得（必要に応じて作成）"""
+        if self._download_sem is None:
+            self._download_sem = asyncio.Semaphore(self._max_concurrent)
+        return self._download_sem
+
+    async def _monitor_resources(self, interval: float = 1.0):
+        """
+        システムリソースを定期的にチェックし、結果を保持する
+
+        Args:
+            interval: チェック間隔（秒）
+        """
+        while True:
+            self._resources_ok = await self._check_resources()
+            await asyncio.sleep(interval)
+
     def _create_directory_structure(self, base_dir: str) -> Dict[str, str]:
         """
         必要なディレクトリ構造を作成
@@ -93,9 +125,70 @@ class SiteSaver:
             
         return dirs
 
+    def _join_url(self, base_url: str, src: str) -> str:
+        """
+        ベースURLと参照URLを結合
+        
+        絶対URLとルート相対パスはurljoinを通さず文字列操作のみで処理する
+        
+        Args:
+            base_url: ベースURL
+            src: タグから取得した参照URL
+            
+        Returns:
+            str: 絶対URL
+        """
+        if src.startswith(('http://', 'https://')):
+            return src
+        if src.startswith('/') and not src.startswith('//') and '/.' not in src:
+            cached_base, origin = self._base_origin
+            if cached_base != base_url:
+                parts = urlparse(base_url)
+                origin = f"{parts.scheme}://{parts.netloc}"
+                self._base_origin = (base_url, origin)
+            return origin + src
+        return urljoin(base_url, src)
+
+    def _collect_tags(self, soup: Any) -> TagDict:
+        """
+        1回の走査でリソース関連のタグを種類別に収集
+        
+        Args:
+            soup: BeautifulSoupオブジェクト
+            
+        Returns:
+            Dict: 種類ごとのタグのリスト
+        """
+        tags: TagDict = {
+            'images': [],
+            'videos': [],
+            'styles': [],
+            'scripts': [],
+            'inline_styles': [],
+            'inline_scripts': []
+        }
+
+        for tag in soup.find_all(['img', 'video', 'source', 'link', 'style', 'script']):
+            name = tag.name
+            if name == 'img':
+                tags['images'].append(tag)
+            elif name in ('video', 'source'):
+                tags['videos'].append(tag)
+            elif name == 'link':
+                if 'stylesheet' in (tag.get('rel') or []):
+                    tags['styles'].append(tag)
+            elif name == 'style':
+                tags['inline_styles'].append(tag)
+            elif tag.has_attr('src'):
+                tags['scripts'].append(tag)
+            else:
+                tags['inline_scripts'].append(tag)
+
+        return tags
+
     async def _extract_and_save_resources(
         self,
-        soup: Any,
+        tags: TagDict,
         base_url: str,
         dirs: Dict[str, str]
     ) -> ResourceDict:
@@ -103,7 +196,7 @@ class SiteSaver:
         リソースを抽出して保存
         
         Args:
-            soup: BeautifulSoupオブジェクト
+            tags: _collect_tagsで収集したタグ
             base_url: ベースURL
             dirs: 保存先ディレクトリ
             
@@ -115,24 +208,33 @@ class SiteSaver:
             'videos': []
         }
 
+        # 同一URLの重複ダウンロードを防ぐ
+        seen: Set[str] = set()
+
         # 画像の抽出と保存
-        images = soup.find_all('img')
+        images = tags['images']
         image_tasks = []
         for img in images:
             src = img.get('src')
             if src:
-                full_url = urljoin(base_url, src)
+                full_url = self._join_url(base_url, src)
+                if full_url in seen:
+                    continue
+                seen.add(full_url)
                 image_tasks.append(self._download_and_save_resource(
                     full_url, dirs['images'], 'images'
                 ))
 
         # 動画の抽出と保存
-        videos = soup.find_all(['video', 'source'])
+        videos = tags['videos']
         video_tasks = []
         for video in videos:
             src = video.get('src')
             if src:
-                full_url = urljoin(base_url, src)
+                full_url = self._join_url(base_url, src)
+                if full_url in seen:
+                    continue
+                seen.add(full_url)
                 video_tasks.append(self._download_and_save_resource(
                     full_url, dirs['videos'], 'videos'
                 ))
@@ -158,39 +260,43 @@ class SiteSaver:
         resource_type: str
     ) -> Tuple[str, Dict[str, str], bool]:
         """リソースをダウンロードして保存"""
-        try:
-            result = await self.web_scraper.download_resource(url)
-            if not result.success:
-                self.logger.warning(f"リソースのダウンロード失敗: {url} - {result.error}")
-                return resource_type, {}, False
+        async with self._get_download_semaphore():
+            try:
+                result = await self.web_scraper.download_resource(url)
+                if not result.success:
+                    self.logger.warning(f"リソースのダウンロード失敗: {url} - {result.error}")
+                    return resource_type, {}, False
+
+                # コンテンツタイプの検証
+                content_type = result.content_type
+                if not self._is_valid_resource_type(content_type, resource_type):
+                    self.logger.warning(f"不正なコンテンツタイプ: {url} - {content_type}")
+                    return resource_type, {}, False
+
+                # ファイル名の生成と重複チェック
+                filename = (
+                    os.path.basename(urlparse(url).path)
+                    or f'resource_{hashlib.sha256(url.encode()).hexdigest()[:16]}'
+                )
+                filename = self.file_manager._sanitize_filename(filename)
+                local_path = os.path.join(save_dir, filename)
+                local_path = self.file_manager._get_unique_path(local_path)
+
+                # ファイルの保存
+                if self._resources_ok:
+                    if await self.file_manager.safe_write_async(local_path, result.content, mode='wb'):
+                        return resource_type, {
+                            'path': url,
+                            'local_path': f"./{resource_type}/{os.path.basename(local_path)}",
+                            'content_type': content_type,
+                            'size': result.size
+                        }, True
 
-            # コンテンツタイプの検証
-            content_type = result.content_type
-            if not self._is_valid_resource_type(content_type, resource_type):
-                self.logger.warning(f"不正なコンテンツタイプ: {url} - {content_type}")
                 return resource_type, {}, False
 
-            # ファイル名の生成と重複チェック
-            filename = os.path.basename(urlparse(url).path) or f'resource_{hash(url)}'
-            filename = self.content_processor._sanitize_filename(filename)
-            local_path = os.path.join(save_dir, filename)
-            local_path = self.file_manager._get_unique_path(local_path)
-
-            # ファイルの保存
-            if await self._check_resources():
-                if self.file_manager.safe_write(local_path, result.content, mode='wb'):
-                    return resource_type, {
-                        'path': url,
-                        'local_path': f"./{resource_type}/{os.path.basename(local_path)}",
-                        'content_type': content_type,
-                        'size': result.size
-                    }, True
-
-            return resource_type, {}, False
-
-        except Exception as e:
-            self.logger.error(f"リソース保存エラー: {url} - {str(e)}")
-            return resource_type, {}, False
+            except Exception as e:
+                self.logger.error(f"リソース保存エラー: {url} - {str(e)}")
+                return resource_type, {}, False
 
     def _is_valid_resource_type(self, content_type: str, expected_type: str) -> bool:
         """リソースタイプの検証"""
@@ -202,7 +308,7 @@ class SiteSaver:
 
     async def _extract_styles_and_scripts(
         self,
-        soup: Any,
+        tags: TagDict,
         base_url: str,
         dirs: Dict[str, str]
     ) -> Tuple[List[StyleDict], List[StyleDict]]:
@@ -210,7 +316,7 @@ class SiteSaver:
         CSSとJavaScriptを抽出
         
         Args:
-            soup: BeautifulSoupオブジェクト
+            tags: _collect_tagsで収集したタグ
             base_url: ベースURL
             dirs: 保存先ディレクトリ
             
@@ -220,29 +326,39 @@ class SiteSaver:
         css_data: List[StyleDict] = []
         js_data: List[StyleDict] = []
 
+        # 同一URLの重複ダウンロードを防ぐ
+        seen: Set[str] = set()
+
         # 外部CSSの抽出
         css_tasks = []
-        for link in soup.find_all('link', rel='stylesheet'):
+        for link in tags['styles']:
             href = link.get('href')
             if href:
-                full_url = urljoin(base_url, href)
+                full_url = self._join_url(base_url, href)
+                if full_url in seen:
+                    continue
+                seen.add(full_url)
                 css_tasks.append(self._process_external_resource(
                     full_url, dirs['styles'], 'css'
                 ))
 
         # 外部JavaScriptの抽出
         js_tasks = []
-        for script in soup.find_all('script', src=True):
+        for script in tags['scripts']:
             src = script.get('src')
             if src:
-                full_url = urljoin(base_url, src)
+                full_url = self._join_url(base_url, src)
+                if full_url in seen:
+                    continue
+                seen.add(full_url)
                 js_tasks.append(self._process_external_resource(
                     full_url, dirs['scripts'], 'javascript'
                 ))
 
-        # 並行処理の実行
-        css_results = await asyncio.gather(*css_tasks, return_exceptions=True)
-        js_results = await asyncio.gather(*js_tasks, return_exceptions=True)
+        # 並行処理の実行（CSSとJavaScriptをまとめて実行）
+        results = await asyncio.gather(*css_tasks, *js_tasks, return_exceptions=True)
+        css_results = results[:len(css_tasks)]
+        js_results = results[len(css_tasks):]
 
         # CSS結果の処理
         for result in css_results:
@@ -257,20 +373,21 @@ class SiteSaver:
                 self._update_progress(20 / len(js_tasks))  # 20%をJS処理に割り当て
 
         # インラインスタイルとスクリプトの処理
-        for style in soup.find_all('style'):
+        # NavigableStringはSafeDumperで書き出せないため、通常の文字列に変換して扱う
+        for style in tags['inline_styles']:
             if style.string:
                 content = self.content_processor.sanitize_content(
-                    style.string, 'text/css'
+                    str(style.string), 'text/css'
                 )
                 css_data.append({
                     'path': 'inline',
                     'content': content
                 })
 
-        for script in soup.find_all('script', src=False):
+        for script in tags['inline_scripts']:
             if script.string:
                 content = self.content_processor.sanitize_content(
-                    script.string, 'application/javascript'
+                    str(script.string), 'application/javascript'
                 )
                 js_data.append({
                     'path': 'inline',
@@ -286,34 +403,35 @@ class SiteSaver:
         resource_type: str
     ) -> Dict[str, str]:
         """外部リソースの処理"""
-        try:
-            content = await self.web_scraper.get_text_content(url)
-            if content:
-                # コンテンツの検証と整形
-                content = self.content_processor.sanitize_content(
-                    content,
-                    f'text/{resource_type}'
-                )
-                content = self.content_processor.format_content(
-                    content,
-                    f'text/{resource_type}'
-                )
-
-                # メタデータの抽出
-                metadata = self.content_processor.extract_metadata(
-                    content,
-                    f'text/{resource_type}'
-                )
+        async with self._get_download_semaphore():
+            try:
+                content = await self.web_scraper.get_text_content(url)
+                if content:
+                    # コンテンツの検証と整形
+                    content = self.content_processor.sanitize_content(
+                        content,
+                        f'text/{resource_type}'
+                    )
+                    content = self.content_processor.format_content(
+                        content,
+                        f'text/{resource_type}'
+                    )
+
+                    # メタデータの抽出
+                    metadata = self.content_processor.extract_metadata(
+                        content,
+                        f'text/{resource_type}'
+                    )
+
+                    return {
+                        'path': url,
+                        'content': content,
+                        'metadata': metadata
+                    }
 
-                return {
-                    'path': url,
-                    'content': content,
-                    'metadata': metadata
-                }
-
-        except Exception as e:
-            self.logger.error(f"外部リソース処理エラー: {url} - {str(e)}")
-            return {}
+            except Exception as e:
+                self.logger.error(f"外部リソース処理エラー: {url} - {str(e)}")
+                return {}
 
     async def save(
         self,
@@ -338,6 +456,12 @@ class SiteSaver:
 
         self._progress = 0
         self._progress_callback = progress_callback
+        # セマフォはイベントループごとに作り直す
+        self._download_sem = None
+        self._resources_ok = True
+        # cpu_percentは前回呼び出しとの差分を返すため、ここで計測を開始しておく
+        self._process.cpu_percent(interval=None)
+        monitor_task = asyncio.create_task(self._monitor_resources())
 
         try:
             # URLの検証
@@ -360,26 +484,27 @@ class SiteSaver:
             self._update_progress(5)  # 5%完了
             
             # サイトコンテンツの取得
-            soup = await self.web_scraper.get_page(url)
+            soup, raw_html = await self.web_scraper.fetch_page(url)
             if not soup:
                 self.logger.error(f"サイトコンテンツの取得に失敗しました: {url}")
                 return False
             self._update_progress(10)  # 15%完了
 
-            # リソースの抽出と保存（40%）
-            resources = await self._extract_and_save_resources(soup, url, dirs)
-            # この時点で55%完了
-            
-            # CSSとJavaScriptの抽出（40%）
-            css_data, js_data = await self._extract_styles_and_scripts(soup, url, dirs)
+            # リソースの抽出と保存（40%）とCSS・JavaScriptの抽出（40%）を並行実行
+            tags = self._collect_tags(soup)
+            resources, (css_data, js_data) = await asyncio.gather(
+                self._extract_and_save_resources(tags, url, dirs),
+                self._extract_styles_and_scripts(tags, url, dirs)
+            )
             # この時点で95%完了
 
-            # HTMLの処理
+            # HTMLの処理（取得時の解析結果をサニタイズ・整形・メタデータ抽出で共有する）
+            # タグの収集とリソース・CSS・JavaScriptの抽出は完了しているため、ここで書き換えてよい
             html_content = self.content_processor.sanitize_content(
-                str(soup), 'text/html'
+                raw_html, 'text/html', soup=soup
             )
             html_content = self.content_processor.format_content(
-                html_content, 'text/html'
+                html_content, 'text/html', soup=soup
             )
             
             # YAMLデータの構築
@@ -388,7 +513,7 @@ class SiteSaver:
                     'html': {
                         'main': html_content,
                         'metadata': self.content_processor.extract_metadata(
-                            html_content, 'text/html'
+                            html_content, 'text/html', soup=soup
                         )
                     },
                     'css': css_data,
@@ -408,24 +533,20 @@ class SiteSaver:
             
             # YAMLファイルの保存（5%）
             yaml_path = os.path.join(site_dir, 'site_data.yaml')
-            if self.file_manager.safe_write(
-                yaml_path,
-                yaml.dump(site_data, allow_unicode=True, sort_keys=False),
-                encoding='utf-8'
-            ):
-                self._update_progress(5)  # 100%完了
-                self.logger.info(f"サイト情報を保存しました: {yaml_path}")
-                return True
-            else:
-                self.logger.error("YAMLファイルの保存に失敗しました")
+            try:
+                with self.file_manager.safe_open(yaml_path, 'w', encoding='utf-8') as f:
+                    yaml.dump(site_data, f, Dumper=YAMLDumper, allow_unicode=True, sort_keys=False)
+            except Exception as e:
+                self.logger.error(f"YAMLファイルの保存に失敗しました: {str(e)}")
                 return False
 
+            self._update_progress(5)  # 100%完了
+            self.logger.info(f"サイト情報を保存しました: {yaml_path}")
+            return True
+
         except Exception as e:
             self.logger.error(f"サイト情報の保存に失敗しました: {str(e)}")
             return False
         finally:
+            monitor_task.cancel()
             await self.web_scraper.close()
-
-    def __del__(self):
-        """デストラクタ: リソースのクリーンアップ"""
-        self._executor.shutdown(wait=True)
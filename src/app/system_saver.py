@@ -2,20 +2,122 @@
 # -*- coding: utf-8 -*-
 
 import os
+import atexit
+import gzip
+import heapq
+import io
+import json
+import mimetypes
+import mmap
+import queue
+import shutil
+import tempfile
+import threading
 import yaml
 import filetype
 from datetime import datetime
-from pathlib import Path
-from typing import Dict, Optional, List, Any, Callable
+from typing import Dict, Optional, List, Any, Callable, Iterator, Union
 import time
 import psutil
 from concurrent.futures import ThreadPoolExecutor
 import asyncio
+from collections import deque
+from contextlib import ExitStack
 
-from utils.directory_scanner import DirectoryScanner
+try:
+    from yaml import CSafeDumper as YAMLDumper, CSafeLoader as YAMLLoader
+except ImportError:
+    from yaml import SafeDumper as YAMLDumper, SafeLoader as YAMLLoader
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow未導入時はParquet形式で保存できない
+    pa = pq = None
+
+from utils.directory_scanner import DirectoryScanner, format_timestamp
 from utils.file_manager import FileManager
 from utils.content_processor import ContentProcessor
-from config.settings import Settings
+from config.settings import settings
+
+# I/Oが主体の処理のため、CPU数より多めのワーカーを持つプールをインスタンス間で共有する
+_executor: Optional[ThreadPoolExecutor] = None
+
+# 1回のスレッドプール受け渡しで読み込むファイル数
+_READ_BATCH_SIZE = 32
+
+# text/以外でテキストとして扱うコンテンツタイプ（サブタイプと構造化構文の接尾辞）
+_TEXT_SUBTYPES = frozenset({
+    'json', 'javascript', 'x-javascript', 'ecmascript', 'yaml', 'x-yaml', 'xml'
+})
+_TEXT_SUFFIXES = ('+json', '+xml', '+yaml')
+
+def _get_executor() -> ThreadPoolExecutor:
+    """共有スレッドプールを取得（初回呼び出し時に作成）"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 4) + 4))
+        atexit.register(_executor.shutdown, wait=False)
+    return _executor
+
+def _dump_yaml(data: Any, explicit_start: bool = False) -> str:
+    """データをYAMLのドキュメントに変換"""
+    return yaml.dump(
+        data,
+        Dumper=YAMLDumper,
+        allow_unicode=True,
+        sort_keys=False,
+        default_flow_style=False,
+        explicit_start=explicit_start
+    )
+
+def _dump_json_line(data: Any) -> bytes:
+    """データをjsonlの1行（UTF-8のバイト列）に変換"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, default=str, option=orjson.OPT_APPEND_NEWLINE)
+        except orjson.JSONEncodeError:
+            pass  # 64ビットを超える整数など、orjsonが扱えない値は標準のjsonで処理
+    return (json.dumps(data, ensure_ascii=False, default=str) + '\n').encode('utf-8')
+
+class _ParquetRecordWriter:
+    """ファイル内容のレコードを一定件数ずつParquetの行グループとして書き込む"""
+
+    # レコードの列（metadataは入れ子の辞書のためJSON文字列で保持する）
+    COLUMNS = ('path', 'format', 'size', 'mime_type', 'content', 'blob_ref', 'modified_at', 'metadata')
+
+    def __init__(self, f, compression: Optional[str], row_group_size: int = 1024):
+        schema = pa.schema([
+            (name, pa.int64() if name == 'size' else pa.string()) for name in self.COLUMNS
+        ])
+        self._writer = pq.ParquetWriter(f, schema, compression=compression or 'snappy')
+        self._row_group_size = row_group_size
+        self._columns: Dict[str, list] = {name: [] for name in self.COLUMNS}
+
+    def write(self, record: Dict) -> None:
+        for name, values in self._columns.items():
+            value = record.get(name)
+            if name == 'metadata' and value is not None:
+                value = _dump_json_line(value).decode('utf-8').rstrip('\n')
+            values.append(value)
+        if len(self._columns['path']) >= self._row_group_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._columns['path']:
+            self._writer.write_table(pa.table(self._columns, schema=self._writer.schema))
+            self._columns = {name: [] for name in self.COLUMNS}
+
+    def close(self) -> None:
+        self._flush()
+        self._writer.close()
 
 class SystemSaver:
     """システム情報を収集して保存するクラス"""
@@ -28,7 +130,7 @@ class SystemSaver:
             logger: ロガーインスタンス
         """
         self.logger = logger
-        self.settings = Settings()
+        self.settings = settings
         self.file_manager = FileManager()
         self.directory_scanner = DirectoryScanner()
         self.content_processor = ContentProcessor()
@@ -37,7 +139,21 @@ class SystemSaver:
         self._total_files = 0
         self._processed_files = 0
         self._process = psutil.Process()
-        self._executor = ThreadPoolExecutor(max_workers=os.cpu_count())
+        self._resources_ok = True
+        self._blob_dir = os.path.join(self.settings.SAVE_CONFIG['default_dir'], 'blobs')
+        self._executor = _get_executor()
+
+        # ファイルごとに参照する設定値をあらかじめ取り出しておく
+        performance = self.settings.PERFORMANCE
+        self._max_rss = performance['system_saving']['processing']['max_memory_usage']
+        self._max_cpu = performance['site_saving']['processing']['max_cpu_usage']
+        self._skip_binary = performance['system_saving']['processing'].get('skip_binary', True)
+        self._max_file_size_default = performance['system_saving']['processing']['max_file_size']
+        self._max_depth = performance['system_saving']['scanning'].get('max_depth')
+        self._mmap_threshold = performance['system_saving']['processing'].get('mmap_threshold', 1024 * 1024)
+        self._compression = self.settings.SAVE_CONFIG.get('system_compression')
+        self._compression_level = self.settings.SAVE_CONFIG.get('system_compression_level', 1)
+        self._output_encoding = self.settings.COMPATIBILITY['encoding']['output']['default']
 
     def _update_progress(self, increment: float):
         """進捗を更新"""
@@ -50,13 +166,13 @@ class SystemSaver:
         try:
             # メモリ使用量のチェック
             memory_info = self._process.memory_info()
-            if memory_info.rss > self.settings.PERFORMANCE['system_saving']['processing']['max_memory_usage']:
+            if memory_info.rss > self._max_rss:
                 self.logger.warning("メモリ使用量が制限を超えています")
                 return False
 
             # CPU使用率のチェック
-            cpu_percent = self._process.cpu_percent()
-            if cpu_percent > self.settings.PERFORMANCE['site_saving']['processing']['max_cpu_usage']:
+            cpu_percent = self._process.cpu_percent(interval=None)
+            if cpu_percent > self._max_cpu:
                 self.logger.warning("CPU使用率が制限を超えています")
                 return False
 
@@ -66,69 +182,273 @@ class SystemSaver:
             self.logger.error(f"リソースチェックエラー: {str(e)}")
             return False
 
+    def _read_files(
+        self,
+        file_infos: List[Dict[str, Any]],
+        max_file_size: Optional[int] = None
+    ) -> List[Optional[Union[bytes, mmap.mmap]]]:
+        """
+        複数のファイルをまとめて読み込む（スレッドプールで1回の受け渡しで実行）
+
+        Args:
+            file_infos: スキャン結果のファイル情報のリスト
+            max_file_size: 最大ファイルサイズ（超える場合は読み込まない）
+
+        Returns:
+            List[Optional[Union[bytes, mmap.mmap]]]: 各ファイルの内容（大きなファイルはmmap、読み込めない場合はNone）
+        """
+        contents: List[Optional[Union[bytes, mmap.mmap]]] = []
+        for file_info in file_infos:
+            # サイズ超過のファイルと、拡張子からバイナリと分かるファイルは読み込まない
+            content_type = mimetypes.guess_type(file_info['name'])[0]
+            if (max_file_size and file_info['size'] > max_file_size) \
+                    or self._is_binary_type(content_type):
+                contents.append(None)
+                continue
+            try:
+                with open(file_info['path'], 'rb') as f:
+                    # 拡張子からテキストと分かる大きなファイルはヒープに読み込まずメモリマップする
+                    if content_type is not None and file_info['size'] > self._mmap_threshold:
+                        contents.append(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+                    else:
+                        contents.append(f.read())
+            except (OSError, ValueError):
+                contents.append(None)
+        return contents
+
+    @staticmethod
+    def _is_binary_type(content_type: Optional[str]) -> bool:
+        """
+        コンテンツタイプがバイナリ（テキスト以外）かどうかを判定
+
+        JSON・JavaScript・YAML・XML（image/svg+xmlなどの+xmlを含む）はテキストとして扱う。
+        判定できない場合（None）はバイナリとみなさない。
+        """
+        if content_type is None:
+            return False
+        main_type, _, subtype = content_type.split(';', 1)[0].strip().lower().partition('/')
+        if main_type == 'text':
+            return False
+        return subtype not in _TEXT_SUBTYPES and not subtype.endswith(_TEXT_SUFFIXES)
+
+    def _store_blob(self, file_path: str) -> str:
+        """
+        バイナリファイルを内容のSHA-256をファイル名としてblobディレクトリにコピー
+
+        内容はPythonのメモリに載せず、ハッシュはファイルから直接計算し、
+        コピーはshutil.copyfile（Linux/macOSではカーネル内コピー）で行う。
+
+        Args:
+            file_path: ファイルパス
+
+        Returns:
+            str: 内容のSHA-256（blobの参照名）
+        """
+        blob_ref = self.content_processor.hash_path(file_path)
+
+        blob_path = os.path.join(self._blob_dir, blob_ref)
+        if not os.path.exists(blob_path):
+            os.makedirs(self._blob_dir, exist_ok=True)
+            temp_fd, temp_path = tempfile.mkstemp(dir=self._blob_dir)
+            os.close(temp_fd)
+            try:
+                shutil.copyfile(file_path, temp_path)
+                os.replace(temp_path, blob_path)
+            except OSError:
+                os.remove(temp_path)
+                raise
+        return blob_ref
+
+    def _write_records(
+        self,
+        record_queue: queue.Queue,
+        f,
+        contents_file,
+        on_written: Callable[[], None]
+    ) -> None:
+        """
+        書き込みスレッド: キューから受け取った結果をシリアライズして書き出す
+
+        Noneを受け取ると終了する。書き込みに失敗しても送り手が止まらないよう、
+        終了通知まではキューを読み続け、最後に例外を送出する。
+
+        Args:
+            record_queue: 結果のリストを受け取るキュー
+            f: YAMLファイル
+            contents_file: jsonl形式（バイナリ）・Parquet形式の出力先（YAML形式の場合はNone）
+            on_written: 結果を1件（リスト1つ分）処理するごとに呼び出す関数
+        """
+        error: Optional[Exception] = None
+        while True:
+            records = record_queue.get()
+            if records is None:
+                break
+            if error is not None:
+                on_written()
+                continue
+            try:
+                for record in records:
+                    if isinstance(contents_file, _ParquetRecordWriter):
+                        contents_file.write(record)
+                    elif contents_file is not None:
+                        contents_file.write(_dump_json_line(record))
+                    else:
+                        f.write(_dump_yaml(record, explicit_start=True))
+            except Exception as e:
+                error = e
+            on_written()
+
+        if error is not None:
+            raise error
+
+    def _start_writer(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        record_queue: queue.Queue,
+        f,
+        contents_file,
+        on_written: Callable[[], None]
+    ) -> asyncio.Future:
+        """
+        書き込みを専用スレッドで開始し、終了時に完了するFutureを返す
+
+        共有スレッドプールを使うと、同時に実行される保存処理の数だけワーカーを
+        占有してしまい、読み込み処理が割り当てられずに停止する恐れがあるため、
+        書き込みは保存処理ごとに専用のスレッドで行う。
+
+        Args:
+            loop: 保存処理を実行しているイベントループ
+            record_queue: 結果のリストを受け取るキュー
+            f: YAMLファイル
+            contents_file: jsonl形式（バイナリ）・Parquet形式の出力先（YAML形式の場合はNone）
+            on_written: 結果を1件処理するごとにイベントループ上で呼び出す関数
+
+        Returns:
+            asyncio.Future: 書き込みスレッドの終了時に完了するFuture
+        """
+        done = loop.create_future()
+
+        def call_in_loop(callback: Callable, *args) -> None:
+            try:
+                loop.call_soon_threadsafe(callback, *args)
+            except RuntimeError:
+                pass  # イベントループが既に終了している
+
+        def resolve(error: Optional[Exception]) -> None:
+            if done.done():
+                return
+            if error is not None:
+                done.set_exception(error)
+            else:
+                done.set_result(None)
+
+        def run() -> None:
+            error = None
+            try:
+                self._write_records(
+                    record_queue, f, contents_file, lambda: call_in_loop(on_written)
+                )
+            except Exception as e:
+                error = e
+            call_in_loop(resolve, error)
+
+        threading.Thread(target=run, name='system-saver-writer', daemon=True).start()
+        return done
+
+    async def _monitor_resources(self, interval: float = 0.25):
+        """
+        システムリソースを定期的にチェックし、結果を保持する
+
+        Args:
+            interval: チェック間隔（秒）
+        """
+        while True:
+            self._resources_ok = await self._check_resources()
+            await asyncio.sleep(interval)
+
     async def _process_file(
         self,
-        file_path: str,
+        file_info: Dict[str, Any],
+        content: Optional[Union[bytes, mmap.mmap]],
         max_file_size: Optional[int] = None
     ) -> Optional[Dict[str, Any]]:
         """
         ファイルを処理
         
         Args:
-            file_path: ファイルパス
+            file_info: スキャン結果のファイル情報（statを含む）
+            content: 読み込み済みのファイル内容（読み込めなかった場合はNone）
             max_file_size: 最大ファイルサイズ
             
         Returns:
             Dict: ファイル情報
         """
+        file_path = file_info['path']
+        mapped = content if isinstance(content, mmap.mmap) else None
         try:
-            if not await self._check_resources():
+            # リソースの状態はバックグラウンドで監視している結果を参照する
+            if not self._resources_ok:
                 return None
 
-            path = Path(file_path)
-            if not path.exists():
-                return None
-
-            stats = path.stat()
+            # スキャン時に取得済みのstatを使い、ここではファイルシステムにアクセスしない
+            stats = file_info['stat']
+            suffix = os.path.splitext(file_info['name'])[1]
             
             # ファイルサイズのチェック
             if max_file_size and stats.st_size > max_file_size:
                 return {
-                    'path': str(path),
-                    'format': path.suffix,
+                    'path': file_path,
+                    'format': suffix,
                     'size': stats.st_size,
                     'skipped': 'size_limit_exceeded'
                 }
 
-            # ファイルの読み取り
-            content = self.file_manager.safe_read(file_path)
-            if content is None:
-                return {
-                    'path': str(path),
-                    'format': path.suffix,
-                    'size': stats.st_size,
-                    'skipped': 'read_error'
-                }
-
-            # コンテンツタイプの判定
-            content_type = self.content_processor.get_content_type(content, path.name)
+            # コンテンツタイプの判定（拡張子で判定できない場合のみ内容を調べる）
+            content_type = mimetypes.guess_type(file_info['name'])[0]
+            if not self._is_binary_type(content_type):
+                # ファイルの読み取り結果の確認
+                if content is None:
+                    return {
+                        'path': file_path,
+                        'format': suffix,
+                        'size': stats.st_size,
+                        'skipped': 'read_error'
+                    }
+                content_type = self.content_processor.get_content_type(content, file_info['name'])
 
             # バイナリファイルのチェック
-            if self.settings.PERFORMANCE['system_saving']['processing'].get('skip_binary', True) and 'text' not in content_type:
+            if self._is_binary_type(content_type):
+                if self._skip_binary:
+                    return {
+                        'path': file_path,
+                        'format': suffix,
+                        'size': stats.st_size,
+                        'mime_type': content_type,
+                        'skipped': 'binary_file'
+                    }
+
+                # バイナリは内容を埋め込まず、blobとして保存して参照のみ記録する
+                blob_ref = await asyncio.get_running_loop().run_in_executor(
+                    self._executor, self._store_blob, file_path
+                )
                 return {
-                    'path': str(path),
-                    'format': path.suffix,
+                    'path': file_path,
+                    'format': suffix,
                     'size': stats.st_size,
                     'mime_type': content_type,
-                    'skipped': 'binary_file'
+                    'blob_ref': blob_ref,
+                    'modified_at': format_timestamp(stats.st_mtime)
                 }
 
-            # エンコーディングの処理
-            if isinstance(content, bytes):
-                content, source_encoding = self.content_processor.convert_encoding(
-                    content,
-                    self.settings.COMPATIBILITY['encoding']['output']['default']
-                )
+            # エンコーディングの処理（UTF-8で読めない場合のみ検出を行う）
+            if isinstance(content, (bytes, mmap.mmap)):
+                try:
+                    content = str(content, 'utf-8')
+                except UnicodeDecodeError:
+                    content, source_encoding = self.content_processor.convert_encoding(
+                        bytes(content),
+                        self._output_encoding
+                    )
 
             # コンテンツの整形
             formatted_content = self.content_processor.format_content(content, content_type)
@@ -137,18 +457,21 @@ class SystemSaver:
             metadata = self.content_processor.extract_metadata(formatted_content, content_type)
 
             return {
-                'path': str(path),
-                'format': path.suffix,
+                'path': file_path,
+                'format': suffix,
                 'size': stats.st_size,
                 'mime_type': content_type,
                 'content': formatted_content,
                 'metadata': metadata,
-                'modified_at': datetime.fromtimestamp(stats.st_mtime).isoformat()
+                'modified_at': format_timestamp(stats.st_mtime)
             }
 
         except Exception as e:
             self.logger.error(f"ファイル処理エラー ({file_path}): {str(e)}")
             return None
+        finally:
+            if mapped is not None:
+                mapped.close()
 
     async def save(
         self,
@@ -169,10 +492,14 @@ class SystemSaver:
         Returns:
             bool: 保存が成功したかどうか
         """
-        try:
-            self._progress = 0
-            self._progress_callback = progress_callback
+        self._progress = 0
+        self._progress_callback = progress_callback
+        self._resources_ok = True
+        # cpu_percentは前回呼び出しとの差分を返すため、ここで計測を開始しておく
+        self._process.cpu_percent(interval=None)
+        monitor_task = asyncio.create_task(self._monitor_resources())
 
+        try:
             # パスの検証
             if not self.file_manager.validate_path(system_path):
                 self.logger.error(f"無効なシステムパス: {system_path}")
@@ -184,78 +511,63 @@ class SystemSaver:
 
             # 保存先ディレクトリの作成
             os.makedirs(save_dir, exist_ok=True)
+            self._blob_dir = os.path.join(save_dir, 'blobs')
             self._update_progress(5)  # 5%完了
 
             # ディレクトリ構造の取得（20%）
             structure_tree = self.directory_scanner.get_directory_structure(
                 system_path,
-                max_depth=self.settings.PERFORMANCE['system_saving']['scanning'].get('max_depth')
+                max_depth=self._max_depth
             )
             self._update_progress(15)  # 20%完了
 
             # ファイル数のカウントとシステム情報の構築（60%）
-            self._total_files = self._count_files(system_path)
+            # カウントは進捗の分母と統計にのみ使うため、スキャンと並行して実行する
+            loop = asyncio.get_running_loop()
+            count_future = loop.run_in_executor(self._executor, self._count_files, system_path)
+            self._total_files = 0
             self._processed_files = 0
+            reported_progress = 0.0
             
-            system_data = {
-                'system': {
-                    'structure_tree': structure_tree,
-                    'contents': [],
-                    'metadata': {
-                        'base_path': system_path,
-                        'saved_at': datetime.now().isoformat(),
-                        'config': {
-                            'max_file_size': max_file_size or self.settings.PERFORMANCE['system_saving']['processing']['max_file_size'],
-                            'skip_binary': self.settings.PERFORMANCE['system_saving']['processing'].get('skip_binary', True),
-                            'max_depth': self.settings.PERFORMANCE['system_saving']['scanning'].get('max_depth')
-                        },
-                        'statistics': {
-                            'total_files': self._total_files,
-                            'processed_files': 0,
-                            'skipped_files': 0,
-                            'error_files': 0
-                        }
-                    }
+            metadata = {
+                'base_path': system_path,
+                'saved_at': datetime.now().isoformat(),
+                'config': {
+                    'max_file_size': max_file_size or self._max_file_size_default,
+                    'skip_binary': self._skip_binary,
+                    'max_depth': self._max_depth
+                },
+                'statistics': {
+                    'total_files': 0,
+                    'processed_files': 0,
+                    'skipped_files': 0,
+                    'error_files': 0
                 }
             }
 
             # ファイル内容の収集
-            stats = system_data['system']['metadata']['statistics']
-            tasks = []
-            
-            async for file_info in self.directory_scanner.scan_directory_async(
-                system_path,
-                max_depth=self.settings.PERFORMANCE['system_saving']['scanning'].get('max_depth')
-            ):
-                if file_info:
-                    file_path = file_info['path']
-                    tasks.append(self._process_file(
-                        file_path,
-                        max_file_size or self.settings.PERFORMANCE['system_saving']['processing']['max_file_size']
-                    ))
-
-                    # バッチ処理（メモリ使用量の制御）
-                    if len(tasks) >= 100:
-                        results = await asyncio.gather(*tasks, return_exceptions=True)
-                        for result in results:
-                            if isinstance(result, dict):
-                                if 'skipped' in result:
-                                    stats['skipped_files'] += 1
-                                elif 'error' in result:
-                                    stats['error_files'] += 1
-                                else:
-                                    stats['processed_files'] += 1
-                                    system_data['system']['contents'].append(result)
-                        
-                        self._processed_files += len(tasks)
-                        if self._total_files > 0:
-                            self._update_progress(60 * (self._processed_files / self._total_files))
-                        
-                        tasks = []
-
-            # 残りのタスクを処理
-            if tasks:
-                results = await asyncio.gather(*tasks, return_exceptions=True)
+            stats = metadata['statistics']
+            file_size_limit = max_file_size or self._max_file_size_default
+            batch = []
+            # 同時に処理するファイル数（I/O主体のためCPU数より多めにとる）
+            concurrency = min(256, (os.cpu_count() or 4) * 8)
+            max_pending = max(1, concurrency // _READ_BATCH_SIZE)
+
+            async def process_batch(batch: List[Dict[str, Any]]) -> list:
+                # 読み込みはバッチ単位でまとめてスレッドプールに渡す
+                contents = await loop.run_in_executor(
+                    self._executor, self._read_files, batch, file_size_limit
+                )
+                return await asyncio.gather(
+                    *(self._process_file(file_info, content, file_size_limit)
+                      for file_info, content in zip(batch, contents)),
+                    return_exceptions=True
+                )
+
+            async def write_results(results: list):
+                # 処理済みの結果は書き込みスレッドに渡し、メモリに保持しない
+                nonlocal reported_progress
+                records = []
                 for result in results:
                     if isinstance(result, dict):
                         if 'skipped' in result:
@@ -264,27 +576,108 @@ class SystemSaver:
                             stats['error_files'] += 1
                         else:
                             stats['processed_files'] += 1
-                            system_data['system']['contents'].append(result)
-
-            # YAMLファイルとして保存（15%）
+                            records.append(result)
+
+                if records:
+                    # 書き込みが追いつくまでイベントループを止めずに待つ
+                    await write_slots.acquire()
+                    record_queue.put_nowait(records)
+
+                self._processed_files += len(results)
+                if not self._total_files and count_future.done():
+                    self._total_files = count_future.result()
+                if self._total_files > 0:
+                    progress = 60 * min(1.0, self._processed_files / self._total_files)
+                    self._update_progress(progress - reported_progress)
+                    reported_progress = progress
+
+            # ファイルへ逐次書き出し
+            # 先頭にディレクトリ構造、続いてファイルごとに1ドキュメント、末尾にメタデータを書く
+            # jsonl・Parquet形式ではファイル内容を別ファイルに書き、YAMLには参照のみ残す
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            yaml_path = os.path.join(save_dir, f"system_{timestamp}.yaml")
-            
-            if self.file_manager.safe_write(
-                yaml_path,
-                yaml.dump(system_data, allow_unicode=True, sort_keys=False),
-                encoding='utf-8'
-            ):
-                self._update_progress(15)  # 100%完了
-                self.logger.info(f"システム情報を保存しました: {yaml_path}")
-                return True
-            else:
-                self.logger.error("YAMLファイルの保存に失敗しました")
-                return False
+            save_format = self.settings.SAVE_CONFIG.get('system_format', 'yaml')
+            if save_format == 'parquet' and pq is None:
+                self.logger.warning("pyarrowがインストールされていないため、jsonl形式で保存します")
+                save_format = 'jsonl'
+            extension = '.gz' if self._compression == 'gzip' else ''
+            yaml_path = os.path.join(save_dir, f"system_{timestamp}.yaml{extension}")
+
+            with ExitStack() as stack:
+                f = self._open_output(stack, yaml_path)
+                header = {'structure_tree': structure_tree}
+
+                contents_file = None
+                if save_format == 'jsonl':
+                    contents_path = os.path.join(save_dir, f"system_{timestamp}.jsonl{extension}")
+                    contents_file = self._open_output(stack, contents_path, binary=True)
+                    header['contents_file'] = os.path.basename(contents_path)
+                elif save_format == 'parquet':
+                    # Parquetは形式内で圧縮するため、gzipでは包まない
+                    contents_path = os.path.join(save_dir, f"system_{timestamp}.parquet")
+                    contents_file = _ParquetRecordWriter(
+                        stack.enter_context(self.file_manager.safe_open(contents_path, 'wb')),
+                        self._compression
+                    )
+                    stack.callback(contents_file.close)
+                    header['contents_file'] = os.path.basename(contents_path)
+
+                f.write(_dump_yaml({'system': header}))
+
+                # シリアライズと書き込みは専用スレッドで行い、スキャン・読み込みと並行させる
+                # キュー自体は上限を設けず、未書き込みの件数はセマフォで制限する
+                record_queue: queue.Queue = queue.Queue()
+                write_slots = asyncio.Semaphore(64)
+                writer = self._start_writer(
+                    loop, record_queue, f, contents_file, write_slots.release
+                )
+
+                # スキャンと処理をパイプライン化する
+                # 処理中のバッチ数に上限を設け、完了したものからスキャン順に書き出す
+                pending = deque()
+                try:
+                    async for file_info in self.directory_scanner.scan_directory_async(
+                        system_path,
+                        max_depth=self._max_depth
+                    ):
+                        if file_info:
+                            batch.append(file_info)
+
+                            if len(batch) >= _READ_BATCH_SIZE:
+                                pending.append(asyncio.ensure_future(process_batch(batch)))
+                                batch = []
+
+                                while len(pending) >= max_pending or (pending and pending[0].done()):
+                                    await write_results(await pending.popleft())
+
+                    # 残りのファイルを処理
+                    if batch:
+                        pending.append(asyncio.ensure_future(process_batch(batch)))
+                    while pending:
+                        await write_results(await pending.popleft())
+                finally:
+                    for task in pending:
+                        task.cancel()
+                    # 書き込みスレッドに終了を通知し、書き終わるまで待つ
+                    record_queue.put_nowait(None)
+                    await asyncio.wait([writer])
+                writer.result()
+
+                self._update_progress(60 - reported_progress)
+
+                # 統計が確定してからメタデータを末尾に書き出す
+                self._total_files = await count_future
+                stats['total_files'] = self._total_files
+                f.write(_dump_yaml({'system': {'metadata': metadata}}, explicit_start=True))
+
+            self._update_progress(15)  # 100%完了
+            self.logger.info(f"システム情報を保存しました: {yaml_path}")
+            return True
 
         except Exception as e:
             self.logger.error(f"システム情報の保存に失敗しました: {str(e)}")
             return False
+        finally:
+            monitor_task.cancel()
 
     def _count_files(self, path: str) -> int:
         """
@@ -296,15 +689,114 @@ class SystemSaver:
         Returns:
             int: ファイル数
         """
+        should_skip_dir = self.settings.should_skip_dir
+        should_skip_file = self.settings.should_skip_file
         count = 0
-        for root, _, files in os.walk(path):
-            if any(excluded in root.split(os.sep)
-                   for excluded in self.settings.EXCLUDED_ITEMS['directories']):
+        stack = [path]
+
+        # 除外ディレクトリには降りないよう、scandirで明示的に深さ優先探索する
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir():
+                            if not entry.is_symlink() and not should_skip_dir(entry.name):
+                                stack.append(entry.path)
+                        elif not should_skip_file(entry.name):
+                            count += 1
+            except OSError:
                 continue
-            count += len([f for f in files
-                         if not self.settings.should_skip_file(f)])
         return count
 
+    def _open_output(self, stack: ExitStack, path: str, binary: bool = False):
+        """
+        保存ファイルを書き込み用に開く（圧縮設定時はgzipで包む）
+
+        Args:
+            stack: ファイルを閉じる順序を管理するExitStack
+            path: 保存先のパス
+            binary: Trueの場合はバイト列を直接書き込むファイルオブジェクトを返す
+
+        Returns:
+            書き込み用のファイルオブジェクト
+        """
+        if self._compression == 'gzip':
+            raw = stack.enter_context(self.file_manager.safe_open(path, 'wb'))
+            compressed = stack.enter_context(
+                gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=self._compression_level)
+            )
+            if binary:
+                return compressed
+            return stack.enter_context(io.TextIOWrapper(compressed, encoding='utf-8'))
+        if binary:
+            return stack.enter_context(self.file_manager.safe_open(path, 'wb'))
+        return stack.enter_context(self.file_manager.safe_open(path, 'w', encoding='utf-8'))
+
+    @staticmethod
+    def _open_saved(path: str, mode: str):
+        """保存ファイルを読み込み用に開く（拡張子が.gzの場合は展開しながら読む）"""
+        encoding = 'utf-8' if 't' in mode else None
+        if path.endswith('.gz'):
+            return gzip.open(path, mode, encoding=encoding)
+        return open(path, mode.replace('t', ''), encoding=encoding)
+
+    def _iter_saved_documents(self, yaml_path: str) -> Iterator[Any]:
+        """保存済みファイルのYAMLドキュメントを先頭から1つずつ読み込む"""
+        with self._open_saved(yaml_path, 'rb') as f:
+            yield from yaml.load_all(f, Loader=YAMLLoader)
+
+    def _iter_jsonl_contents(self, yaml_path: str, contents_file: str) -> Iterator[Dict]:
+        """jsonl形式で保存されたファイル内容を1件ずつ読み込む"""
+        contents_path = os.path.join(os.path.dirname(yaml_path), contents_file)
+        # 書き込みと同じくバイト列のまま扱い、行ごとの文字列へのデコードを省く
+        with self._open_saved(contents_path, 'rb') as f:
+            for line in f:
+                if line.strip():
+                    yield _json_loads(line)
+
+    def _iter_parquet_contents(self, yaml_path: str, contents_file: str) -> Iterator[Dict]:
+        """Parquet形式で保存されたファイル内容を1件ずつ読み込む"""
+        contents_path = os.path.join(os.path.dirname(yaml_path), contents_file)
+        for batch in pq.ParquetFile(contents_path).iter_batches():
+            for row in batch.to_pylist():
+                record = {key: value for key, value in row.items() if value is not None}
+                if 'metadata' in record:
+                    record['metadata'] = json.loads(record['metadata'])
+                yield record
+
+    def _iter_contents_file(self, yaml_path: str, contents_file: str) -> Iterator[Dict]:
+        """別ファイルに保存されたファイル内容を形式に応じて読み込む"""
+        if contents_file.endswith('.parquet'):
+            return self._iter_parquet_contents(yaml_path, contents_file)
+        return self._iter_jsonl_contents(yaml_path, contents_file)
+
+    def iter_saved_contents(self, yaml_path: str) -> Iterator[Dict]:
+        """
+        保存済みシステム情報のファイル内容を1件ずつ取得
+
+        ファイル全体を読み込まずに順に解析するため、大きな保存ファイルでも
+        メモリ使用量は1件分に収まる。
+
+        Args:
+            yaml_path: YAMLファイルのパス
+            
+        Yields:
+            Dict: ファイルごとの情報
+        """
+        try:
+            for document in self._iter_saved_documents(yaml_path):
+                if not isinstance(document, dict) or 'system' not in document:
+                    yield document
+                    continue
+
+                # ヘッダ・メタデータのドキュメント（旧形式はcontentsを含む）
+                system = document['system']
+                yield from system.get('contents') or []
+                if system.get('contents_file'):
+                    yield from self._iter_contents_file(yaml_path, system['contents_file'])
+        except Exception as e:
+            self.logger.error(f"保存済みファイル内容の読み込みに失敗: {str(e)}")
+
     def get_saved_system_info(self, yaml_path: str) -> Optional[Dict]:
         """
         保存済みシステム情報を取得
@@ -316,14 +808,91 @@ class SystemSaver:
             Dict: システム情報（存在しない場合はNone）
         """
         try:
-            content = self.file_manager.safe_read(yaml_path)
-            if content:
-                return yaml.safe_load(content)
-            return None
+            system: Optional[Dict] = None
+            contents = []
+            for document in self._iter_saved_documents(yaml_path):
+                if isinstance(document, dict) and 'system' in document:
+                    if system is None:
+                        system = document['system']
+                    else:
+                        system.update(document['system'])
+                else:
+                    contents.append(document)
+
+            if system is None:
+                return None
+
+            # jsonl・Parquet形式で保存された内容を読み込む
+            contents_file = system.pop('contents_file', None)
+            if contents_file:
+                contents.extend(self._iter_contents_file(yaml_path, contents_file))
+
+            return {
+                'system': {
+                    'structure_tree': system.pop('structure_tree', None),
+                    'contents': system.pop('contents', None) or contents,
+                    **system
+                }
+            }
         except Exception as e:
             self.logger.error(f"保存済みシステム情報の取得に失敗: {str(e)}")
             return None
 
-    def __del__(self):
-        """デストラクタ: リソースのクリーンアップ"""
-        self._executor.shutdown(wait=True)
+    @staticmethod
+    def _is_saved_file_name(name: str) -> bool:
+        """保存結果のファイル名（現行のYAML形式・旧形式のJSON）かどうかを判定"""
+        if name.startswith('system_info_'):
+            return name.endswith('.json')
+        return name.startswith('system_') and name.endswith(('.yaml', '.yaml.gz'))
+
+    def cleanup_old_files(self, max_files: int = 10, save_dir: Optional[str] = None) -> bool:
+        """
+        古い保存ファイルを削除し、新しいものから指定件数だけ残す
+
+        jsonl・Parquet形式の内容ファイルは対応するYAMLと一緒に削除する。
+        blobは複数の保存結果から共有されるため削除しない。
+        旧形式の保存ファイル（system_info_*.json）も対象に含める。
+
+        Args:
+            max_files: 残す保存結果の数
+            save_dir: 保存先ディレクトリ（省略時はoutput_dir、未設定ならデフォルト）
+
+        Returns:
+            bool: 削除が成功したかどうか
+        """
+        try:
+            save_dir = (
+                save_dir
+                or getattr(self, 'output_dir', None)
+                or self.settings.SAVE_CONFIG['default_dir']
+            )
+            with os.scandir(save_dir) as it:
+                saved = [
+                    entry for entry in it
+                    if self._is_saved_file_name(entry.name) and entry.is_file()
+                ]
+            if len(saved) <= max_files:
+                return True
+
+            # 全件をソートせず、残す分だけを更新日時の新しい順に選ぶ
+            keep = {
+                entry.path
+                for entry in heapq.nlargest(max_files, saved, key=lambda e: e.stat().st_mtime)
+            }
+            for entry in saved:
+                if entry.path in keep:
+                    continue
+                os.remove(entry.path)
+                if '.yaml' not in entry.name:
+                    continue  # 旧形式は内容ファイルを持たない
+                stem = entry.name[:entry.name.index('.yaml')]
+                for contents_name in (entry.name.replace('.yaml', '.jsonl', 1), f"{stem}.parquet"):
+                    contents_path = os.path.join(save_dir, contents_name)
+                    if os.path.exists(contents_path):
+                        os.remove(contents_path)
+
+            self.logger.info(f"古い保存ファイルを削除しました: {len(saved) - len(keep)}件")
+            return True
+        except Exception as e:
+            self.logger.error(f"古い保存ファイルの削除に失敗: {str(e)}")
+            return False
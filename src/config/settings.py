@@ -2,6 +2,8 @@
 # -*- coding: utf-8 -*-
 
 import os
+import re
+import bisect
 import platform
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
@@ -9,8 +11,20 @@ import fnmatch
 
 class Settings:
     """アプリケーション設定クラス"""
+
+    _instance: Optional['Settings'] = None
+
+    def __new__(cls):
+        # 設定はプロセス内で1つだけ構築し、以降は同じインスタンスを返す
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
     
     def __init__(self):
+        if getattr(self, '_initialized', False):
+            return
+        self._initialized = True
+
         # プロジェクトのルートディレクトリ
         self.BASE_DIR = Path(__file__).resolve().parent.parent
         
@@ -29,7 +43,8 @@ class Settings:
                     'max_concurrent': 5,
                     'timeout_seconds': 30,
                     'retry_attempts': 3,
-                    'min_bandwidth': 1024 * 1024  # 1MB/s
+                    'min_bandwidth': 1024 * 1024,  # 1MB/s
+                    'chunk_size': 64 * 1024  # 64KB（レスポンス本文を読み込む単位）
                 },
                 'processing': {
                     'max_memory_usage': 1024 * 1024 * 1024,  # 1GB
@@ -43,6 +58,7 @@ class Settings:
                 },
                 'processing': {
                     'max_file_size': 10 * 1024 * 1024,  # 10MB
+                    'mmap_threshold': 1024 * 1024,  # 1MB（これを超えるファイルはメモリマップで読む）
                     'total_files_limit': 1000000,
                     'max_memory_usage': 2 * 1024 * 1024 * 1024  # 2GB
                 }
@@ -59,12 +75,17 @@ class Settings:
             'storage': {
                 'temp_space': 5 * 1024 * 1024 * 1024,  # 5GB
                 'output_limit': 10 * 1024 * 1024 * 1024,  # 10GB
-                'cleanup_policy': 'on_completion'
+                'cleanup_policy': 'on_completion',
+                'hash_chunk_size': 1024 * 1024,  # 1MB（ハッシュ計算時の読み込み単位）
+                'use_io_uring': True,  # Linuxでliburingが使える場合はsafe_writeでio_uringを使う
+                'cross_process_locks': False  # Trueの場合は他プロセスとも排他するロックファイルを使う
             },
             'network': {
                 'max_bandwidth': 10 * 1024 * 1024,  # 10MB/s
                 'connection_limit': 10,
-                'timeout_seconds': 30
+                'timeout_seconds': 30,
+                'dns_cache_ttl': 300,  # DNS解決結果のキャッシュ期間（秒）
+                'keepalive_timeout': 60  # アイドル接続を保持する期間（秒）
             }
         }
 
@@ -93,6 +114,11 @@ class Settings:
             }
         }
 
+        # 制限パスは正規化済みの接頭辞として保持し、二分探索で判定する
+        self._restricted_prefixes = self._build_restricted_prefixes(
+            self.SECURITY['file_access']['restricted_paths']
+        )
+
         # 互換性設定
         self.COMPATIBILITY = {
             'python_version': '>=3.8',
@@ -159,12 +185,22 @@ class Settings:
                 '.env'
             ]
         }
+
+        # 除外判定はファイルごとに呼ばれるため、パターンを一度だけコンパイルしておく
+        self._excluded_file_re = re.compile(
+            '|'.join(fnmatch.translate(pattern) for pattern in self.EXCLUDED_ITEMS['files']),
+            re.IGNORECASE if os.name == 'nt' else 0
+        )
+        self._excluded_dirs_set = frozenset(self.EXCLUDED_ITEMS['directories'])
         
         # 保存設定
         self.SAVE_CONFIG = {
             'default_dir': str(self.BASE_DIR / 'saved_content'),
             'backup_dir': str(self.BASE_DIR / 'backups'),
-            'temp_dir': str(self.BASE_DIR / 'temp')
+            'temp_dir': str(self.BASE_DIR / 'temp'),
+            'system_format': 'yaml',  # 'yaml'、'jsonl'（ファイル内容を別ファイルに1行1レコードで保存）または 'parquet'（要pyarrow）
+            'system_compression': None,  # None または 'gzip'
+            'system_compression_level': 1
         }
 
     def _get_restricted_paths(self) -> List[str]:
@@ -189,13 +225,29 @@ class Settings:
             
         return restricted
 
+    @staticmethod
+    def _build_restricted_prefixes(restricted_paths: List[str]) -> Tuple[str, ...]:
+        """
+        制限パスを正規化・ソートした接頭辞のタプルに変換
+
+        他の接頭辞に含まれる接頭辞は除外し、二分探索で直前の要素だけを
+        確認すれば判定できるようにする。
+        """
+        prefixes: List[str] = []
+        for prefix in sorted(os.path.normcase(os.path.abspath(p)) for p in restricted_paths):
+            if not prefixes or not prefix.startswith(prefixes[-1]):
+                prefixes.append(prefix)
+        return tuple(prefixes)
+
+    def _is_normalized_path_restricted(self, path: str) -> bool:
+        """正規化済みのパスが制限されているかチェック"""
+        path = os.path.normcase(path)
+        i = bisect.bisect_right(self._restricted_prefixes, path) - 1
+        return i >= 0 and path.startswith(self._restricted_prefixes[i])
+
     def is_path_restricted(self, path: str) -> bool:
         """パスが制限されているかチェック"""
-        path = os.path.abspath(path)
-        return any(
-            path.startswith(os.path.abspath(restricted))
-            for restricted in self.SECURITY['file_access']['restricted_paths']
-        )
+        return self._is_normalized_path_restricted(os.path.abspath(path))
 
     def is_allowed_protocol(self, url: str) -> Tuple[bool, bool]:
         """
@@ -237,7 +289,7 @@ class Settings:
         """パスの検証と正規化"""
         try:
             normalized = os.path.abspath(path)
-            if self.is_path_restricted(normalized):
+            if self._is_normalized_path_restricted(normalized):
                 return None
             return normalized
         except Exception:
@@ -254,10 +306,19 @@ class Settings:
             bool: スキップすべきかどうか
         """
         # 除外ファイルパターンとのマッチングをチェック
-        return any(
-            fnmatch.fnmatch(filename, pattern)
-            for pattern in self.EXCLUDED_ITEMS['files']
-        )
+        return self._excluded_file_re.match(filename) is not None
+
+    def should_skip_dir(self, dirname: str) -> bool:
+        """
+        ディレクトリをスキップすべきかどうかを判断
+        
+        Args:
+            dirname: ディレクトリ名
+            
+        Returns:
+            bool: スキップすべきかどうか
+        """
+        return dirname in self._excluded_dirs_set
 
 # シングルトンインスタンスを作成
 settings = Settings()
@@ -0,0 +1,12 @@
+import shutil
+import tempfile
+from config.settings import settings
+
+# src.app.loggerはインポート時にログファイルを開くため、テストモジュールの
+# 読み込みより前に、ログの出力先を追跡対象のsrc/logsから一時ディレクトリへ切り替える
+_log_dir = tempfile.mkdtemp(prefix='data_get_system_logs_')
+settings.LOGGING_CONFIG['log_dir'] = _log_dir
+
+def pytest_unconfigure(config):
+    """テスト終了時に一時ログディレクトリを削除"""
+    shutil.rmtree(_log_dir, ignore_errors=True)
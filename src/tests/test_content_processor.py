@@ -0,0 +1,34 @@
+import pytest
+from unittest.mock import patch
+from src.utils import content_processor as content_processor_module
+from src.utils.content_processor import ContentProcessor
+
+_JS_SOURCE = """
+import { helper } from './helper.js';
+function main() { return helper(); }
+class Widget {}
+export function render() {}
+"""
+
+@pytest.fixture
+def content_processor():
+    """テスト用のContentProcessorインスタンスを作成"""
+    return ContentProcessor()
+
+def test_extract_js_metadata(content_processor):
+    """JavaScriptのメタデータが抽出されることを確認"""
+    metadata = content_processor._extract_js_metadata(_JS_SOURCE)
+    assert 'main' in metadata['functions']
+    assert 'Widget' in metadata['classes']
+    assert './helper.js' in metadata['imports']
+    assert 'render' in metadata['exports']
+
+def test_extract_js_metadata_falls_back_to_esprima(content_processor):
+    """tree-sitterの初期化に失敗した場合もesprimaでメタデータが抽出されることを確認"""
+    content_processor._use_tree_sitter = True
+    with patch.object(content_processor_module, 'get_parser', side_effect=TypeError('incompatible')):
+        metadata = content_processor._extract_js_metadata(_JS_SOURCE)
+    assert 'main' in metadata['functions']
+    assert 'Widget' in metadata['classes']
+    assert './helper.js' in metadata['imports']
+    assert not content_processor._use_tree_sitter
@@ -1,17 +1,17 @@
 import pytest
 import logging
 import os
-from src.app.logger import Logger
+from src.app.logger import Logger, FastRotatingFileHandler, get_logger
 
 @pytest.fixture
 def logger():
     """テスト用のロガーインスタンスを作成"""
-    return Logger()
+    return get_logger()
 
 def test_logger_singleton(logger):
-    """ロガーがシングルトンパターンを実装していることを確認"""
-    logger2 = Logger()
-    assert logger is logger2
+    """ロガーの設定がプロセス内で共有されることを確認"""
+    assert get_logger() is logger
+    assert Logger()._logger is logger._logger
 
 def test_logger_initialization(logger):
     """ロガーが正しく初期化されることを確認"""
@@ -76,3 +76,19 @@ def test_log_rotation(logger, tmp_path):
     # ログファイルとバックアップファイルが存在することを確認
     assert log_file.exists()
     assert any(f.name.startswith("app.log.") for f in log_dir.iterdir())
+
+def test_fast_rotating_handler_rollover(tmp_path):
+    """メモリ上のサイズ管理でローテーションが行われることを確認"""
+    log_file = tmp_path / "fast.log"
+    handler = FastRotatingFileHandler(log_file, maxBytes=100, backupCount=2, encoding='utf-8')
+    test_logger = logging.getLogger('test_fast_rotating')
+    test_logger.addHandler(handler)
+    test_logger.propagate = False
+
+    for _ in range(10):
+        test_logger.warning("x" * 30)
+    handler.close()
+    test_logger.removeHandler(handler)
+
+    assert (tmp_path / "fast.log.1").exists()
+    assert all(f.stat().st_size <= 100 for f in tmp_path.iterdir())
@@ -1,7 +1,8 @@
 import pytest
+import asyncio
 import json
 import os
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 from datetime import datetime
 from src.app.system_saver import SystemSaver
 from src.app.logger import Logger
@@ -166,6 +167,32 @@ def test_cleanup_old_files(system_saver, tmp_path):
     remaining_files = list(tmp_path.glob("system_info_*.json"))
     assert len(remaining_files) == 10  # max_filesの数だけ残っていることを確認
 
+def test_cleanup_old_files_removes_contents_files(system_saver, tmp_path):
+    """古い保存結果の内容ファイル（jsonl・Parquet）も一緒に削除されることを確認"""
+    system_saver.output_dir = str(tmp_path)
+    names = [
+        ("system_20230101_000000.yaml", "system_20230101_000000.jsonl"),
+        ("system_20230101_000001.yaml.gz", "system_20230101_000001.jsonl.gz"),
+        ("system_20230101_000002.yaml", "system_20230101_000002.parquet"),
+        ("system_20230101_000003.yaml", "system_20230101_000003.jsonl"),
+    ]
+    for i, (yaml_name, contents_name) in enumerate(names):
+        for name in (yaml_name, contents_name):
+            (tmp_path / name).write_text('')
+            os.utime(tmp_path / name, (i, i))
+    (tmp_path / "blobs").mkdir()
+
+    # クリーンアップを実行
+    result = system_saver.cleanup_old_files(max_files=1)
+
+    # 検証（最新の保存結果とblobディレクトリのみ残る）
+    assert result is True
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "blobs",
+        "system_20230101_000003.jsonl",
+        "system_20230101_000003.yaml",
+    ]
+
 def test_cleanup_failed(system_saver, mock_logger):
     """クリーンアップが失敗するケースをテスト"""
     # 無効なディレクトリを設定
@@ -177,3 +204,48 @@ def test_cleanup_failed(system_saver, mock_logger):
     # 検証
     assert result is False
     assert mock_logger.error.called
+
+@pytest.mark.parametrize('compression', [None, 'gzip'])
+@pytest.mark.parametrize('system_format', ['yaml', 'jsonl', 'parquet'])
+def test_save_round_trip(system_saver, mock_logger, tmp_path, system_format, compression):
+    """保存形式・圧縮方式ごとに、保存した内容を読み戻せることを確認"""
+    if system_format == 'parquet':
+        pytest.importorskip('pyarrow')
+
+    # 保存対象のディレクトリを作成
+    source = tmp_path / 'source'
+    (source / 'sub').mkdir(parents=True)
+    (source / 'a.txt').write_text('hello\n', encoding='utf-8')
+    (source / 'sub' / 'b.json').write_text('{"key": "値"}', encoding='utf-8')
+    save_dir = tmp_path / 'saved'
+
+    # 圧縮方式は初期化時に読み込まれるため、設定を変更してから作成する
+    with patch.dict(system_saver.settings.SAVE_CONFIG,
+                    {'system_format': system_format, 'system_compression': compression}):
+        saver = SystemSaver(mock_logger)
+        # プロセスのメモリ使用量や負荷は他のテストの影響を受けるため、
+        # 保存処理・スキャン・ファイル書き込みのリソースチェックは常に成功させる
+        with patch.object(saver, '_check_resources', AsyncMock(return_value=True)), \
+                patch.object(saver.directory_scanner, '_check_performance', return_value=True), \
+                patch.object(saver.file_manager, '_check_memory_usage', return_value=True):
+            assert asyncio.run(saver.save(str(source), str(save_dir))) is True
+
+    saved_files = list(save_dir.glob('system_*.yaml.gz' if compression else 'system_*.yaml'))
+    assert len(saved_files) == 1
+    saved_path = str(saved_files[0])
+    expected_paths = {str(source / 'a.txt'), str(source / 'sub' / 'b.json')}
+
+    # 全体の読み込み
+    info = saver.get_saved_system_info(saved_path)
+    assert info is not None
+    system = info['system']
+    assert system['structure_tree'] is not None
+    assert system['metadata']['statistics']['processed_files'] == 2
+    contents = {record['path']: record for record in system['contents']}
+    assert set(contents) == expected_paths
+    assert contents[str(source / 'a.txt')]['content'] == 'hello\n'
+    assert '値' in contents[str(source / 'sub' / 'b.json')]['content']
+
+    # 1件ずつの読み込み
+    records = list(saver.iter_saved_contents(saved_path))
+    assert {record['path'] for record in records} == expected_paths
@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import chardet
+import codecs
+import copy
 import mimetypes
 import os
 from typing import Dict, Optional, Union, Tuple, List
@@ -12,20 +13,108 @@ import yaml
 from pathlib import Path
 import re
 from bs4 import BeautifulSoup
-import cssutils
+import tinycss2
 import esprima
 import hashlib
+from collections import OrderedDict
 
 from config.settings import Settings
 
+try:
+    import orjson
+except ImportError:  # orjson未導入時は標準のjsonを使用
+    orjson = None
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:  # lxml未導入時は標準のパーサを使用
+    HTML_PARSER = 'html.parser'
+
+try:
+    from blake3 import blake3
+except ImportError:  # blake3未導入時はSHA-256でハッシュを計算
+    blake3 = None
+
+try:
+    from tree_sitter_languages import get_language, get_parser
+except ImportError:  # tree-sitter未導入時はesprimaで解析
+    get_language = get_parser = None
+
+# エンコーディング検出器（C実装を優先し、CONTENT_ENCODING_DETECTOR=chardetで従来のchardetを強制）
+if os.getenv('CONTENT_ENCODING_DETECTOR') == 'chardet':
+    import chardet as _encoding_detector
+else:
+    try:
+        import cchardet as _encoding_detector
+    except ImportError:
+        try:
+            import charset_normalizer as _encoding_detector
+        except ImportError:
+            import chardet as _encoding_detector
+
 logger = logging.getLogger(__name__)
 
+# ASCII判定を行う先頭バイト数
+MIN_ENCODING_DETECT = 4096
+# エンコーディング検出器に渡す最大バイト数
+MAX_DETECT_BYTES = 65536
+
+# 抽出済みメタデータを保持する件数（コンテンツのハッシュ単位）
+_METADATA_CACHE_SIZE = 1024
+
+# 内容からの種別判定で先頭を調べるバイト数と、JSON/YAMLとして解析する上限
+_SNIFF_HEAD_BYTES = 512
+_SNIFF_PARSE_LIMIT = 65536
+# CSS/JavaScriptのキーワードを調べる先頭バイト数と、両者のキーワードをまとめた正規表現
+_SNIFF_SCAN_BYTES = 8192
+_SNIFF_KEYWORD_RE = re.compile(
+    rb'(?P<css>margin|padding|color)|(?P<js>function|var|let|const|class|import|export)'
+)
+# YAMLらしい先頭（文書区切りまたは「キー: 」で始まる行）
+_YAML_HEAD_RE = re.compile(rb'^---\s|^[A-Za-z_][\w\-]*:\s', re.M)
+
+# orjsonは64ビットを超える整数を浮動小数点数として読み込むため、19桁以上の数字列を含む場合は標準のjsonを使う
+_LONG_DIGITS_RE = re.compile(r'\d{19}')
+
+# JavaScriptのメタデータ抽出用クエリ（tree-sitter）
+_JS_METADATA_QUERY = """
+(function_declaration name: (identifier) @functions)
+(generator_function_declaration name: (identifier) @functions)
+(class_declaration name: (identifier) @classes)
+(import_statement source: (string) @imports)
+(export_statement declaration: [
+  (function_declaration name: (identifier) @exports)
+  (generator_function_declaration name: (identifier) @exports)
+  (class_declaration name: (identifier) @exports)
+])
+"""
+
+# バイナリ判定で調べる先頭バイト数と、テキストファイルでよく使用される文字
+_BINARY_CHECK_BYTES = 8192
+_TEXT_CHARS = bytes({7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x100)) - {0x7f})
+
+# BOMとエンコーディングの対応（UTF-32はUTF-16と先頭が重なるため先に判定）
+_BOM_ENCODINGS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
 class ContentProcessor:
     """コンテンツ処理を行うユーティリティクラス"""
 
     def __init__(self):
         self.settings = Settings()
-        cssutils.log.setLevel(logging.ERROR)  # CSSパース時の警告を抑制
+        self._metadata_cache: OrderedDict = OrderedDict()
+        self._js_parser = None
+        self._js_query = None
+        # tree-sitterの初期化に失敗した場合はFalseにし、以降はesprimaで解析する
+        self._use_tree_sitter = get_parser is not None
         self._setup_mimetypes()
 
     def _setup_mimetypes(self):
@@ -61,9 +150,19 @@ class ContentProcessor:
             str: 検出されたエンコーディング
         """
         try:
-            result = chardet.detect(content)
+            # BOM付きならそのまま確定
+            for bom, bom_encoding in _BOM_ENCODINGS:
+                if content.startswith(bom):
+                    return bom_encoding
+
+            # 先頭がASCIIのみなら全体も確認して検出器を省略
+            if content[:MIN_ENCODING_DETECT].isascii() and content.isascii():
+                return 'ascii'
+
+            # 検出は先頭部分のみで行う
+            result = _encoding_detector.detect(content[:MAX_DETECT_BYTES])
             encoding = result['encoding']
-            confidence = result['confidence']
+            confidence = result['confidence'] or 0.0
             
             if confidence < 0.7:  # 信頼度が低い場合
                 logger.warning(f"エンコーディング検出の信頼度が低い: {confidence}")
@@ -91,8 +190,10 @@ class ContentProcessor:
             if source_encoding.lower() == target_encoding.lower():
                 return content.decode(source_encoding), source_encoding
                 
-            # デコード→エンコード
+            # デコード→エンコード（UTF-8はすべての文字を表現できるため確認を省略）
             decoded = content.decode(source_encoding)
+            if codecs.lookup(target_encoding).name == 'utf-8':
+                return decoded, source_encoding
             return decoded.encode(target_encoding).decode(target_encoding), source_encoding
             
         except Exception as e:
@@ -100,10 +201,13 @@ class ContentProcessor:
             return content.decode('utf-8', errors='replace'), 'unknown'
 
     def _is_binary(self, content: bytes) -> bool:
-        """バイナリコンテンツかどうかを判定"""
-        # テキストファイルでよく使用される文字のパターン
-        text_chars = bytearray({7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x100)) - {0x7f})
-        return bool(content.translate(None, text_chars))
+        """バイナリコンテンツかどうかを判定（先頭部分のみを調べる）"""
+        head = content[:_BINARY_CHECK_BYTES]
+        # NULLバイトを含めばバイナリ（git・libmagicと同じ判定）
+        if b'\x00' in head:
+            return True
+        # テキストで使われない制御文字が3割を超える場合もバイナリとみなす
+        return len(head.translate(None, _TEXT_CHARS)) > len(head) * 0.3
 
     def _detect_content_type_from_content(self, content: bytes) -> str:
         """コンテンツの内容からタイプを推測"""
@@ -111,29 +215,44 @@ class ContentProcessor:
         if content.startswith(b'<!DOCTYPE html') or content.startswith(b'<html'):
             return 'text/html'
         
+        # CSS/JavaScriptのキーワードを先頭部分の1回の走査で調べる
+        sample = content[:_SNIFF_SCAN_BYTES]
+        found = set()
+        for match in _SNIFF_KEYWORD_RE.finditer(sample):
+            found.add(match.lastgroup)
+            if len(found) == 2:
+                break
+
         # CSSの検出
-        if b'{' in content and (b'margin' in content or b'padding' in content or b'color' in content):
+        if 'css' in found and b'{' in sample:
             return 'text/css'
         
         # JavaScriptの検出
-        js_keywords = [b'function', b'var', b'let', b'const', b'class', b'import', b'export']
-        if any(keyword in content for keyword in js_keywords):
+        if 'js' in found:
             return 'application/javascript'
         
-        # JSONの検出
-        if content.startswith(b'{') and content.endswith(b'}'):
+        head = content[:_SNIFF_HEAD_BYTES]
+
+        # JSONの検出（先頭・末尾の括弧で絞り込み、解析は上限以下のサイズのみ）
+        if head.lstrip().startswith((b'{', b'[')) and content.rstrip().endswith((b'}', b']')):
+            if len(content) > _SNIFF_PARSE_LIMIT:
+                return 'application/json'
             try:
-                json.loads(content)
+                _json_loads(content)
                 return 'application/json'
-            except:
+            except Exception:
                 pass
         
-        # YAMLの検出
-        try:
-            yaml.safe_load(content)
-            return 'application/x-yaml'
-        except:
-            pass
+        # YAMLの検出（YAMLらしい行がある場合のみ、先頭部分を行単位で解析）
+        if _YAML_HEAD_RE.search(head):
+            sample = content
+            if len(sample) > _SNIFF_PARSE_LIMIT:
+                sample = sample[:sample.rfind(b'\n', 0, _SNIFF_PARSE_LIMIT) + 1]
+            try:
+                yaml.safe_load(sample)
+                return 'application/x-yaml'
+            except Exception:
+                pass
         
         # バイナリかテキストかの判定
         return 'application/octet-stream' if self._is_binary(content) else 'text/plain'
@@ -166,14 +285,31 @@ class ContentProcessor:
             logger.error(f"コンテンツタイプ判定エラー: {str(e)}")
             return 'application/octet-stream'
 
+    def parse_html(self, content: Union[str, bytes]) -> BeautifulSoup:
+        """
+        HTMLを解析（lxmlが使える場合はlxmlで解析）
+        
+        同じHTMLをサニタイズ・整形・メタデータ抽出に通す場合は、
+        この結果を各メソッドのsoup引数に渡すと解析が1回で済む。
+        
+        Args:
+            content: HTMLのコンテンツ
+            
+        Returns:
+            BeautifulSoup: 解析結果
+        """
+        return BeautifulSoup(content, HTML_PARSER)
+
     def extract_metadata(self, content: Union[str, bytes],
-                        content_type: Optional[str] = None) -> Dict:
+                        content_type: Optional[str] = None,
+                        soup: Optional[BeautifulSoup] = None) -> Dict:
         """
         コンテンツからメタデータを抽出
         
         Args:
             content: メタデータ抽出対象のコンテンツ
             content_type: コンテンツタイプ（オプション）
+            soup: 解析済みのHTML（オプション）
             
         Returns:
             Dict: 抽出されたメタデータ
@@ -181,101 +317,218 @@ class ContentProcessor:
         if content_type is None:
             content_type = self.get_content_type(content)
             
+        # サイズとハッシュの計算用にエンコードは1回だけ行う
+        raw = content.encode() if isinstance(content, str) else content
+        # 同一内容の判定用のハッシュ（暗号用途ではないため、使える場合は高速なBLAKE3を使う）
+        if blake3 is not None:
+            digest, hash_algorithm = blake3(raw).digest(), 'blake3'
+        else:
+            digest, hash_algorithm = hashlib.sha256(raw).digest(), 'sha256'
         metadata = {
             'content_type': content_type,
-            'size': len(content.encode()) if isinstance(content, str) else len(content),
-            'hash': hashlib.sha256(
-                content.encode() if isinstance(content, str) else content
-            ).hexdigest(),
+            'size': len(raw),
+            'hash': digest.hex(),
+            'hash_algorithm': hash_algorithm,
             'extracted_at': datetime.now().isoformat()
         }
         
         try:
             if 'text/html' in content_type:
-                metadata.update(self._extract_html_metadata(content))
+                metadata.update(self._get_cached_metadata(
+                    (digest, 'html'),
+                    lambda html: self._extract_html_metadata(html, soup),
+                    content))
             elif 'text/css' in content_type:
-                metadata.update(self._extract_css_metadata(content))
+                metadata.update(self._get_cached_metadata(
+                    (digest, 'css'), self._extract_css_metadata, content))
             elif 'javascript' in content_type:
-                metadata.update(self._extract_js_metadata(content))
+                metadata.update(self._get_cached_metadata(
+                    (digest, 'js'), self._extract_js_metadata, content))
                 
         except Exception as e:
             logger.error(f"メタデータ抽出エラー: {str(e)}")
             
         return metadata
 
-    def _extract_html_metadata(self, content: str) -> Dict:
+    def _get_cached_metadata(self, key: Tuple[bytes, str], extractor, content: str) -> Dict:
+        """同一内容のメタデータはキャッシュから返す（LRU）"""
+        cached = self._metadata_cache.get(key)
+        if cached is None:
+            cached = extractor(content)
+            self._metadata_cache[key] = cached
+            if len(self._metadata_cache) > _METADATA_CACHE_SIZE:
+                self._metadata_cache.popitem(last=False)
+        else:
+            self._metadata_cache.move_to_end(key)
+        # 呼び出し側での変更がキャッシュに波及しないよう複製を返す
+        return copy.deepcopy(cached)
+
+    @staticmethod
+    def hash_path(path: str, algorithm: str = 'sha256') -> str:
+        """
+        ファイルの内容のハッシュを計算
+        
+        内容をPythonのバイト列として読み込まず、ファイルから直接ハッシュを計算する。
+        
+        Args:
+            path: ファイルパス
+            algorithm: hashlibのアルゴリズム名
+            
+        Returns:
+            str: 16進数のハッシュ値
+        """
+        with open(path, 'rb') as f:
+            if hasattr(hashlib, 'file_digest'):  # Python 3.11以降
+                return hashlib.file_digest(f, algorithm).hexdigest()
+            digest = hashlib.new(algorithm)
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+            return digest.hexdigest()
+
+    def _extract_html_metadata(self, content: str, soup: Optional[BeautifulSoup] = None) -> Dict:
         """HTMLからメタデータを抽出"""
-        soup = BeautifulSoup(content, 'html.parser')
+        if soup is None:
+            soup = self.parse_html(content)
         metadata = {
-            'title': soup.title.string if soup.title else None,
+            'title': str(soup.title.string) if soup.title and soup.title.string else None,
             'meta_tags': {},
             'links': [],
             'scripts': [],
             'images': []
         }
         
-        # メタタグの解析
-        for meta in soup.find_all('meta'):
-            name = meta.get('name', meta.get('property'))
-            if name:
-                metadata['meta_tags'][name] = meta.get('content')
-                
-        # リンクの収集
-        for link in soup.find_all('link'):
-            href = link.get('href')
-            if href:
-                metadata['links'].append({
-                    'href': href,
-                    'rel': link.get('rel', []),
-                    'type': link.get('type')
-                })
-                
-        # スクリプトの収集
-        for script in soup.find_all('script'):
-            src = script.get('src')
-            if src:
-                metadata['scripts'].append({
-                    'src': src,
-                    'type': script.get('type', 'text/javascript')
-                })
-                
-        # 画像の収集
-        for img in soup.find_all('img'):
-            src = img.get('src')
-            if src:
-                metadata['images'].append({
-                    'src': src,
-                    'alt': img.get('alt'),
-                    'width': img.get('width'),
-                    'height': img.get('height')
-                })
+        # 対象のタグは1回の走査でまとめて集め、タグ名で振り分ける
+        for tag in soup.find_all(['meta', 'link', 'script', 'img']):
+            # メタタグの解析
+            if tag.name == 'meta':
+                name = tag.get('name', tag.get('property'))
+                if name:
+                    metadata['meta_tags'][name] = tag.get('content')
+                    
+            # リンクの収集
+            elif tag.name == 'link':
+                href = tag.get('href')
+                if href:
+                    metadata['links'].append({
+                        'href': href,
+                        'rel': list(tag.get('rel', [])),
+                        'type': tag.get('type')
+                    })
+                    
+            # スクリプトの収集
+            elif tag.name == 'script':
+                src = tag.get('src')
+                if src:
+                    metadata['scripts'].append({
+                        'src': src,
+                        'type': tag.get('type', 'text/javascript')
+                    })
+                    
+            # 画像の収集
+            else:
+                src = tag.get('src')
+                if src:
+                    metadata['images'].append({
+                        'src': src,
+                        'alt': tag.get('alt'),
+                        'width': tag.get('width'),
+                        'height': tag.get('height')
+                    })
                 
         return metadata
 
     def _extract_css_metadata(self, content: str) -> Dict:
         """CSSからメタデータを抽出"""
-        stylesheet = cssutils.parseString(content)
+        rules = self._parse_css(content)
         metadata = {
-            'rules_count': len(stylesheet.cssRules),
+            'rules_count': len(rules),
             'selectors': [],
             'imports': [],
             'media_queries': []
         }
         
-        for rule in stylesheet.cssRules:
-            if rule.type == rule.STYLE_RULE:
-                metadata['selectors'].append(rule.selectorText)
-            elif rule.type == rule.IMPORT_RULE:
-                metadata['imports'].append(rule.href)
-            elif rule.type == rule.MEDIA_RULE:
-                metadata['media_queries'].append(rule.media.mediaText)
+        for rule in rules:
+            if rule.type == 'qualified-rule':
+                metadata['selectors'].append(tinycss2.serialize(rule.prelude).strip())
+            elif rule.type == 'at-rule' and rule.lower_at_keyword == 'import':
+                href = self._get_css_import_href(rule)
+                if href:
+                    metadata['imports'].append(href)
+            elif rule.type == 'at-rule' and rule.lower_at_keyword == 'media':
+                metadata['media_queries'].append(tinycss2.serialize(rule.prelude).strip())
                 
         return metadata
 
+    @staticmethod
+    def _parse_css(content: str) -> List:
+        """CSSを解析してトップレベルのルールを返す（不正なルールは除外）"""
+        return [
+            rule for rule in tinycss2.parse_stylesheet(
+                content, skip_comments=True, skip_whitespace=True
+            )
+            if rule.type != 'error'
+        ]
+
+    @staticmethod
+    def _get_css_import_href(rule) -> Optional[str]:
+        """@importルールから参照先を取得"""
+        for token in rule.prelude:
+            if token.type in ('string', 'url'):
+                return token.value
+            if token.type == 'function' and token.lower_name == 'url':
+                for argument in token.arguments:
+                    if argument.type == 'string':
+                        return argument.value
+            if token.type not in ('whitespace', 'comment'):
+                break
+        return None
+
+    @staticmethod
+    def _serialize_css(rules: List, drop_expressions: bool = False) -> str:
+        """
+        CSSのルールを1ルールずつ、宣言は1行ずつに整形して文字列に変換
+        
+        Args:
+            rules: _parse_cssで得たルール
+            drop_expressions: Trueの場合はexpression()を含む宣言を除去
+        """
+        lines = []
+        for rule in rules:
+            if rule.type != 'qualified-rule':
+                lines.append(rule.serialize().strip())
+                continue
+                
+            lines.append(tinycss2.serialize(rule.prelude).strip() + ' {')
+            for declaration in tinycss2.parse_declaration_list(
+                rule.content, skip_comments=True, skip_whitespace=True
+            ):
+                if declaration.type != 'declaration':
+                    continue
+                value = tinycss2.serialize(declaration.value).strip()
+                if drop_expressions and 'expression' in value:
+                    continue
+                important = ' !important' if declaration.important else ''
+                lines.append(f'    {declaration.name}: {value}{important};')
+            lines.append('}')
+        return '\n'.join(lines)
+
     def _extract_js_metadata(self, content: str) -> Dict:
         """JavaScriptからメタデータを抽出"""
+        if self._use_tree_sitter:
+            try:
+                return self._extract_js_metadata_tree_sitter(content)
+            except Exception as e:
+                # 互換性のないtree-sitterのバージョンなどで初期化に失敗した場合は使用をやめる
+                if self._js_query is None:
+                    self._use_tree_sitter = False
+                logger.warning(f"tree-sitterでの解析に失敗したため、esprimaで解析します: {str(e)}")
+
         try:
-            ast = esprima.parseScript(content)
+            # import・exportを含むコードはモジュールとしてのみ解析できる
+            try:
+                ast = esprima.parseModule(content)
+            except esprima.Error:
+                ast = esprima.parseScript(content)
             metadata = {
                 'functions': [],
                 'classes': [],
@@ -291,52 +544,73 @@ class ContentProcessor:
                 elif node.type == 'ImportDeclaration':
                     metadata['imports'].append(node.source.value)
                 elif node.type == 'ExportNamedDeclaration':
-                    if node.declaration and node.declaration.id:
+                    if node.declaration and getattr(node.declaration, 'id', None):
                         metadata['exports'].append(node.declaration.id.name)
                 
-            def traverse(node, metadata):
+            # toDict()で辞書に複製せず、esprimaのノードをスタックで直接たどる（出現順を維持）
+            node_class = esprima.nodes.Node
+            stack = [ast]
+            while stack:
+                node = stack.pop()
                 visit_node(node, metadata)
-                for key, value in node.items():
-                    if isinstance(value, dict) and 'type' in value:
-                        traverse(value, metadata)
+                for value in reversed(list(vars(node).values())):
+                    if isinstance(value, node_class):
+                        stack.append(value)
                     elif isinstance(value, list):
-                        for item in value:
-                            if isinstance(item, dict) and 'type' in item:
-                                traverse(item, metadata)
-            
-            traverse(ast.toDict(), metadata)
+                        stack.extend(
+                            item for item in reversed(value) if isinstance(item, node_class)
+                        )
             return metadata
             
         except Exception as e:
             logger.error(f"JavaScript解析エラー: {str(e)}")
             return {}
 
-    def format_content(self, content: str, content_type: str) -> str:
+    def _extract_js_metadata_tree_sitter(self, content: str) -> Dict:
+        """tree-sitter（C実装のパーサ）でJavaScriptからメタデータを抽出"""
+        if self._js_query is None:
+            self._js_parser = get_parser('javascript')
+            self._js_query = get_language('javascript').query(_JS_METADATA_QUERY)
+
+        source = content.encode('utf-8')
+        tree = self._js_parser.parse(source)
+        metadata = {
+            'functions': [],
+            'classes': [],
+            'imports': [],
+            'exports': []
+        }
+        for node, key in self._js_query.captures(tree.root_node):
+            text = source[node.start_byte:node.end_byte].decode('utf-8')
+            if key == 'imports':
+                text = text[1:-1]  # 引用符を除去
+            metadata[key].append(text)
+        return metadata
+
+    def format_content(self, content: str, content_type: str,
+                       soup: Optional[BeautifulSoup] = None) -> str:
         """
         コンテンツを整形
         
         Args:
             content: 整形対象のコンテンツ
             content_type: コンテンツタイプ
+            soup: 解析済みのHTML（オプション）
             
         Returns:
             str: 整形されたコンテンツ
         """
         try:
             if 'text/html' in content_type:
-                soup = BeautifulSoup(content, 'html.parser')
+                if soup is None:
+                    soup = self.parse_html(content)
                 return soup.prettify()
             elif 'text/css' in content_type:
-                sheet = cssutils.parseString(content)
-                return sheet.cssText.decode()
+                return self._serialize_css(self._parse_css(content))
             elif 'javascript' in content_type:
                 return content  # JavaScriptは既存のフォーマットを維持
             elif 'json' in content_type:
-                return json.dumps(
-                    json.loads(content),
-                    indent=2,
-                    ensure_ascii=False
-                )
+                return self._format_json(content)
             elif 'yaml' in content_type or 'yml' in content_type:
                 return yaml.dump(
                     yaml.safe_load(content),
@@ -350,20 +624,40 @@ class ContentProcessor:
             logger.error(f"コンテンツ整形エラー: {str(e)}")
             return content
 
-    def sanitize_content(self, content: str, content_type: str) -> str:
+    @staticmethod
+    def _format_json(content: str) -> str:
+        """JSONを2スペースのインデントで整形（orjsonが使えない値は標準のjsonで処理）"""
+        if orjson is not None and not _LONG_DIGITS_RE.search(content):
+            try:
+                return orjson.dumps(
+                    orjson.loads(content),
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+                ).decode('utf-8')
+            except (orjson.JSONDecodeError, orjson.JSONEncodeError):
+                pass
+        return json.dumps(
+            json.loads(content),
+            indent=2,
+            ensure_ascii=False
+        )
+
+    def sanitize_content(self, content: str, content_type: str,
+                         soup: Optional[BeautifulSoup] = None) -> str:
         """
         コンテンツを安全な形式に変換
         
         Args:
             content: サニタイズ対象のコンテンツ
             content_type: コンテンツタイプ
+            soup: 解析済みのHTML（オプション。サニタイズ結果で書き換えられる）
             
         Returns:
             str: サニタイズされたコンテンツ
         """
         try:
             if 'text/html' in content_type:
-                soup = BeautifulSoup(content, 'html.parser')
+                if soup is None:
+                    soup = self.parse_html(content)
                 # スクリプトタグの除去
                 for script in soup.find_all('script'):
                     script.decompose()
@@ -375,13 +669,7 @@ class ContentProcessor:
                 return str(soup)
             elif 'text/css' in content_type:
                 # 危険なCSSプロパティの除去
-                sheet = cssutils.parseString(content)
-                for rule in sheet.cssRules:
-                    if rule.type == rule.STYLE_RULE:
-                        for prop in rule.style:
-                            if 'expression' in prop.value:
-                                rule.style.removeProperty(prop.name)
-                return sheet.cssText.decode()
+                return self._serialize_css(self._parse_css(content), drop_expressions=True)
             else:
                 return content
                 
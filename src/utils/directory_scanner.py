@@ -3,13 +3,17 @@
 
 import os
 import fnmatch
+import re
 import filetype
 from pathlib import Path
 from typing import List, Generator, Dict, Optional, Set, Tuple
 from datetime import datetime
 import logging
 import asyncio
+from collections import deque
+from itertools import islice
 from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import psutil
 import time
 
@@ -17,6 +21,26 @@ from config.settings import Settings
 
 logger = logging.getLogger(__name__)
 
+# 1回のスレッドプール受け渡しで情報を取得するファイル数
+_SCAN_BATCH_SIZE = 256
+
+# ファイル形式の判定に読み込む先頭バイト数（filetypeが参照する範囲と同じ）
+_SIGNATURE_BYTES = 8192
+
+# パフォーマンスチェックの間隔（呼び出し回数・秒）。間の呼び出しは前回の結果を返す
+_PERF_CHECK_EVERY = 256
+_PERF_CHECK_INTERVAL = 0.5
+
+@lru_cache(maxsize=1024)
+def format_timestamp(timestamp: float) -> str:
+    """
+    タイムスタンプをISO形式の文字列に変換
+
+    チェックアウトや展開で作られたファイルは作成・更新日時が揃うことが多いため、
+    同じ値の変換結果を再利用する。
+    """
+    return datetime.fromtimestamp(timestamp).isoformat()
+
 class DirectoryScanner:
     """ディレクトリをスキャンして特定のファイルやパターンを検索するユーティリティクラス"""
 
@@ -27,13 +51,32 @@ class DirectoryScanner:
         self._process = psutil.Process()
         self._start_time = time.time()
         self._files_processed = 0
+        self._perf_calls = 0
+        self._last_perf_check = 0.0
+        self._last_perf_ok = True
         self._executor = ThreadPoolExecutor(max_workers=os.cpu_count())
 
+        # ファイルごとに参照する設定値は初期化時に取り出しておく
+        self._excluded_dirs = frozenset(self.settings.EXCLUDED_ITEMS['directories'])
+        self._max_memory_usage = self.settings.PERFORMANCE['system_saving']['processing']['max_memory_usage']
+        self._max_file_size = self.settings.PERFORMANCE['system_saving']['processing']['max_file_size']
+        self._min_files_per_second = self.settings.PERFORMANCE['system_saving']['scanning']['files_per_second']
+
     def _check_performance(self) -> bool:
-        """パフォーマンス指標をチェック"""
+        """パフォーマンス指標をチェック（一定回数・一定時間ごとに計測）"""
+        self._perf_calls += 1
+        now = time.monotonic()
+        if self._perf_calls % _PERF_CHECK_EVERY and now - self._last_perf_check < _PERF_CHECK_INTERVAL:
+            return self._last_perf_ok
+        self._last_perf_check = now
+        self._last_perf_ok = self._measure_performance()
+        return self._last_perf_ok
+
+    def _measure_performance(self) -> bool:
+        """パフォーマンス指標を計測して判定"""
         # メモリ使用量のチェック
         memory_info = self._process.memory_info()
-        if memory_info.rss > self.settings.PERFORMANCE['system_saving']['processing']['max_memory_usage']:
+        if memory_info.rss > self._max_memory_usage:
             logger.warning("メモリ使用量が制限を超えています")
             return False
 
@@ -41,106 +84,105 @@ class DirectoryScanner:
         elapsed_time = time.time() - self._start_time
         if elapsed_time > 0:
             files_per_second = self._files_processed / elapsed_time
-            if files_per_second < self.settings.PERFORMANCE['system_saving']['scanning']['files_per_second']:
+            if files_per_second < self._min_files_per_second:
                 logger.warning("処理速度が低下しています")
                 return False
 
         return True
 
-    def _should_skip_path(self, path: str) -> bool:
+    def _should_skip_path(self, path: str, is_file: Optional[bool] = None) -> bool:
         """
         パスをスキップすべきかどうかを判定
         
         Args:
             path: チェックするパス
+            is_file: ファイルかどうか（Noneの場合はファイルシステムで確認）
             
         Returns:
             bool: スキップすべき場合はTrue
         """
-        path_obj = Path(path)
-        
         # 制限パスのチェック
-        if self.settings.is_path_restricted(str(path_obj)):
+        if self.settings.is_path_restricted(path):
             logger.warning(f"制限パスをスキップ: {path}")
             return True
         
         # 除外ディレクトリのチェック
-        if any(excluded in path_obj.parts 
-               for excluded in self.settings.EXCLUDED_ITEMS['directories']):
+        if not self._excluded_dirs.isdisjoint(os.path.normpath(path).split(os.sep)):
             return True
             
-        # 除外ファイルのチェック
-        if path_obj.is_file():
-            return any(
-                fnmatch.fnmatch(path_obj.name, pattern)
-                for pattern in self.settings.EXCLUDED_ITEMS['files']
-            )
+        # 除外ファイルのチェック（パターンは設定側でコンパイル済み）
+        if is_file is None:
+            is_file = os.path.isfile(path)
+        if is_file:
+            return self.settings.should_skip_file(os.path.basename(path))
             
         return False
 
-    async def _get_file_info_async(self, file_path: str) -> Optional[Dict]:
+    def _get_file_infos(self, entries: List[os.DirEntry]) -> List[Optional[Dict]]:
         """
-        ファイル情報を非同期で取得
+        ファイル情報をまとめて取得（スレッドプールで実行）
         
         Args:
-            file_path: ファイルパス
+            entries: スキャンで得たファイルのエントリ
             
         Returns:
-            Dict: ファイル情報
+            List[Optional[Dict]]: エントリと同じ順序のファイル情報
         """
-        try:
-            loop = asyncio.get_event_loop()
-            return await loop.run_in_executor(
-                self._executor,
-                self._get_file_info_sync,
-                file_path
-            )
-        except Exception as e:
-            logger.error(f"ファイル情報取得エラー: {str(e)}")
-            return None
+        return [self._get_file_info_sync(entry.path, entry) for entry in entries]
 
-    def _get_file_info_sync(self, file_path: str) -> Optional[Dict]:
+    def _get_file_info_sync(self, file_path: str, entry: Optional[os.DirEntry] = None) -> Optional[Dict]:
         """
         ファイル情報を同期的に取得
         
         Args:
             file_path: ファイルパス
+            entry: スキャンで得たエントリ（指定時はキャッシュされたstatを使う）
             
         Returns:
             Dict: ファイル情報
         """
         try:
-            path_obj = Path(file_path)
-            if not path_obj.exists():
+            name = os.path.basename(file_path)
+            try:
+                stats = entry.stat() if entry is not None else os.stat(file_path)
+            except FileNotFoundError:
                 return None
-
-            stats = path_obj.stat()
             
             # ファイルサイズのチェック
-            if stats.st_size > self.settings.PERFORMANCE['system_saving']['processing']['max_file_size']:
+            if stats.st_size > self._max_file_size:
                 logger.warning(f"サイズ制限超過: {file_path}")
                 return {
-                    'path': str(path_obj),
-                    'name': path_obj.name,
+                    'path': file_path,
+                    'name': name,
                     'size': stats.st_size,
+                    'stat': stats,
                     'skipped': 'size_limit_exceeded'
                 }
 
-            kind = filetype.guess(str(path_obj))
+            # 先頭部分を1回だけ読み込んで判定し、読み込めなければアクセス権なしとする
+            head = b''
+            readable = True
+            try:
+                with open(file_path, 'rb', buffering=0) as f:
+                    head = f.read(_SIGNATURE_BYTES)
+            except PermissionError:
+                readable = False
+            kind = filetype.guess(head) if head else None
             
             file_info = {
-                'path': str(path_obj),
-                'name': path_obj.name,
+                'path': file_path,
+                'name': name,
                 'size': stats.st_size,
-                'created_at': datetime.fromtimestamp(stats.st_ctime).isoformat(),
-                'modified_at': datetime.fromtimestamp(stats.st_mtime).isoformat(),
+                'created_at': format_timestamp(stats.st_ctime),
+                'modified_at': format_timestamp(stats.st_mtime),
                 'mime_type': kind.mime if kind else 'text/plain',
-                'extension': path_obj.suffix.lower(),
-                'permissions': oct(stats.st_mode)[-3:]
+                'extension': os.path.splitext(name)[1].lower(),
+                'permissions': oct(stats.st_mode)[-3:],
+                'stat': stats
             }
 
             # アクセス権のチェック
-            if not os.access(file_path, os.R_OK):
+            if not readable:
                 file_info['skipped'] = 'access_denied'
                 logger.warning(f"アクセス権限なし: {file_path}")
                 return file_info
@@ -152,6 +194,85 @@ class DirectoryScanner:
             logger.error(f"ファイル情報取得エラー ({file_path}): {str(e)}")
             return None
 
+    def _iter_file_entries(
+        self,
+        directory_path: str,
+        max_depth: Optional[int],
+        pattern: Optional[str],
+        include_hidden: bool
+    ) -> Generator[os.DirEntry, None, None]:
+        """
+        os.scandirでディレクトリを深さ優先にたどり、対象ファイルのエントリを返す
+
+        os.walkと同じく各ディレクトリのファイルを先に返し、シンボリックリンクの
+        ディレクトリはたどらない。
+
+        Args:
+            directory_path: スキャンするディレクトリのパス
+            max_depth: スキャンする最大深度（Noneの場合は無制限）
+            pattern: ファイル名のパターン（例: '*.py'）
+            include_hidden: 隠しファイルを含めるかどうか
+
+        Yields:
+            os.DirEntry: ファイルのエントリ
+        """
+        # パターンはファイルごとに解釈し直さないよう一度だけコンパイルする
+        # （fnmatch.fnmatchと同じく、Windowsでは大文字・小文字を区別しない）
+        pattern_re = re.compile(
+            fnmatch.translate(pattern), re.IGNORECASE if os.name == 'nt' else 0
+        ) if pattern else None
+
+        stack = [(directory_path, 0)]
+        while stack:
+            if not self._check_performance():
+                logger.error("パフォーマンス制限に達しました")
+                return
+
+            root, depth = stack.pop()
+            try:
+                with os.scandir(root) as it:
+                    entries = list(it)
+            except OSError as e:
+                logger.error(f"ディレクトリ読み込みエラー {root}: {str(e)}")
+                continue
+
+            subdirs = []
+            for entry in entries:
+                name = entry.name
+                if not include_hidden and name.startswith('.'):
+                    continue
+
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+
+                if is_dir:
+                    # 深度のチェック・除外ディレクトリの処理
+                    if max_depth is not None and depth + 1 > max_depth:
+                        continue
+                    if entry.is_symlink() or self._should_skip_path(entry.path, is_file=False):
+                        continue
+                    subdirs.append(entry.path)
+                    continue
+
+                # 既にスキャン済みのファイルはスキップ
+                if entry.path in self._scanned_files:
+                    continue
+
+                # パスのチェック
+                if self._should_skip_path(entry.path, is_file=True):
+                    continue
+
+                # パターンのチェック
+                if pattern_re is not None and not pattern_re.match(name):
+                    continue
+
+                yield entry
+
+            # os.walkと同じ順序でたどるため逆順に積む
+            stack.extend((subdir, depth + 1) for subdir in reversed(subdirs))
+
     async def scan_directory_async(
         self,
         directory_path: str,
@@ -173,65 +294,41 @@ class DirectoryScanner:
         Yields:
             Generator[Dict, None, None]: ファイル情報のジェネレータ
         """
+        pending = deque()
         try:
-            base_path = Path(directory_path)
-            if not base_path.exists():
+            if not os.path.isdir(directory_path):
                 logger.error(f"ディレクトリが存在しません: {directory_path}")
                 return
 
-            for root, dirs, files in os.walk(directory_path):
-                if not self._check_performance():
-                    logger.error("パフォーマンス制限に達しました")
-                    break
-
-                # 深度のチェック
-                if max_depth is not None:
-                    current_depth = len(Path(root).relative_to(base_path).parts)
-                    if current_depth > max_depth:
-                        dirs.clear()
-                        continue
-
-                # 除外ディレクトリの処理
-                dirs[:] = [
-                    d for d in dirs
-                    if not self._should_skip_path(os.path.join(root, d))
-                    and (include_hidden or not d.startswith('.'))
-                ]
-
-                # ファイルの処理
-                tasks = []
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    
-                    # 既にスキャン済みのファイルはスキップ
-                    if file_path in self._scanned_files:
-                        continue
-                        
-                    # パスのチェック
-                    if self._should_skip_path(file_path):
-                        continue
-                        
-                    # 隠しファイルのチェック
-                    if not include_hidden and file.startswith('.'):
-                        continue
-                        
-                    # パターンのチェック
-                    if pattern and not fnmatch.fnmatch(file, pattern):
-                        continue
+            # 返すパスの表記をそろえるため、起点のパスだけ一度正規化する
+            directory_path = str(Path(directory_path))
 
-                    tasks.append(self._get_file_info_async(file_path))
+            loop = asyncio.get_running_loop()
+            # ディレクトリの境界をまたいでバッチにまとめ、スレッドプールで並行して情報を取得する
+            # 処理中のバッチ数に上限を設け、完了したものからスキャン順に返す
+            max_pending = os.cpu_count() or 1
+            file_entries = self._iter_file_entries(directory_path, max_depth, pattern, include_hidden)
+            while True:
+                batch = list(islice(file_entries, _SCAN_BATCH_SIZE))
+                if batch:
+                    pending.append(loop.run_in_executor(self._executor, self._get_file_infos, batch))
 
-                if tasks:
-                    file_infos = await asyncio.gather(*tasks)
-                    for file_info in file_infos:
+                while pending and (not batch or len(pending) >= max_pending or pending[0].done()):
+                    for file_info in await pending.popleft():
                         if file_info:
                             if max_size and file_info.get('size', 0) > max_size:
                                 file_info['skipped'] = 'size_limit_exceeded'
                             self._scanned_files.add(file_info['path'])
                             yield file_info
 
+                if not batch:
+                    break
+
         except Exception as e:
             logger.error(f"ディレクトリスキャンエラー {directory_path}: {str(e)}")
+        finally:
+            for future in pending:
+                future.cancel()
 
     def get_directory_structure(
         self,
@@ -315,6 +412,9 @@ class DirectoryScanner:
         self._scanned_files.clear()
         self._files_processed = 0
         self._start_time = time.time()
+        self._perf_calls = 0
+        self._last_perf_check = 0.0
+        self._last_perf_ok = True
 
     def __del__(self):
         """デストラクタ: スレッドプールをクリーンアップ"""
@@ -1,76 +1,417 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import io
 import os
+import errno
+import itertools
+import queue
+import asyncio
+import threading
+import weakref
 import shutil
 import tempfile
 import logging
 import platform
+import time
 from pathlib import Path
-from typing import Optional, Union, BinaryIO, TextIO, List, Dict
+from typing import Optional, Union, BinaryIO, TextIO, List, Dict, Set, Tuple, Callable
 import hashlib
 from datetime import datetime
 import psutil
-from contextlib import contextmanager
+from contextlib import contextmanager, ExitStack
+from dataclasses import dataclass
+from functools import lru_cache
+
+try:
+    import fcntl
+except ImportError:  # Windowsではreflinkによるバックアップを使わない
+    fcntl = None
+
+try:
+    from blake3 import blake3
+except ImportError:  # blake3未導入時はSHA-256でハッシュを計算
+    blake3 = None
+
+try:
+    import liburing
+except ImportError:  # Linux以外やliburing未導入時は従来の書き込み経路を使う
+    liburing = None
 
 from config.settings import Settings
 
 logger = logging.getLogger(__name__)
 
+# メモリ・ディスク容量チェックの結果を再利用する期間（秒）
+_RESOURCE_CHECK_TTL = 0.1
+
+# 名前のない一時ファイル（Linux専用、他の環境ではNone）
+_O_TMPFILE = getattr(os, 'O_TMPFILE', None)
+
+# O_TMPFILEやリンクに未対応であることを示すエラー番号
+_TMPFILE_UNSUPPORTED_ERRNOS = frozenset({
+    errno.EOPNOTSUPP, errno.EISDIR, errno.EINVAL, errno.EXDEV, errno.ENOENT, errno.EPERM
+})
+
+# reflinkでファイルを複製するioctl（Linux）
+_FICLONE = 0x40049409
+
+# reflinkに未対応であることを示すエラー番号
+_REFLINK_UNSUPPORTED_ERRNOS = frozenset({
+    errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL, errno.EXDEV, errno.EPERM
+})
+
+# io_uringの1回のwriteで書き込める上限（これを超える内容は従来の経路で書き込む）
+_URING_MAX_WRITE = 0x7ffff000
+
+# 書き込みとリネームに必要なio_uring操作
+_URING_REQUIRED_OPS = ('IORING_OP_WRITE', 'IORING_OP_RENAMEAT')
+
+@lru_cache(maxsize=1)
+def _uring_supported() -> bool:
+    """liburingが使え、必要なio_uring操作にカーネルが対応しているか確認"""
+    if liburing is None:
+        return False
+    try:
+        probe = liburing.io_uring_get_probe()
+    except Exception:
+        return False
+    if probe is None:
+        return False
+    try:
+        return all(
+            liburing.io_uring_opcode_supported(probe, getattr(liburing.io_uring_op, op))
+            for op in _URING_REQUIRED_OPS
+        )
+    except Exception:
+        return False
+    finally:
+        liburing.io_uring_free_probe(probe)
+
+def _prep_write_and_rename(ring, fd: int, data: bytes, temp_path: str, path: str,
+                           user_data: int = 0) -> None:
+    """
+    fdへの書き込みとtemp_pathからpathへのリネームをリングに積む
+
+    2つの操作はIOSQE_IO_LINKで連結するため、書き込みが失敗（または途中で終了）
+    するとリネームは実行されない。user_dataには書き込みがuser_data、
+    リネームがuser_data + 1として設定される。
+    """
+    sqe = liburing.io_uring_get_sqe(ring)
+    liburing.io_uring_prep_write(sqe, fd, data, 0)
+    sqe.flags |= liburing.IOSQE_IO_LINK
+    sqe.user_data = user_data
+    sqe = liburing.io_uring_get_sqe(ring)
+    liburing.io_uring_prep_rename(sqe, temp_path, path)
+    sqe.user_data = user_data + 1
+
+def _completion_error(entry, expected: Optional[int] = None) -> Optional[OSError]:
+    """完了エントリの結果を確認し、失敗していればOSErrorを返す"""
+    try:
+        # 失敗した操作ではresの参照時にOSErrorが送出される
+        res = entry.res
+    except OSError as e:
+        return e
+    if expected is not None and res != expected:
+        return OSError(errno.EIO, f"書き込みが途中で終了しました: {res}/{expected}バイト")
+    return None
+
+class UringWriter:
+    """
+    io_uringで書き込みとリネームを連結して一度に投入するヘルパー
+
+    リングはスレッドごとに作成して使い回す。liburingが無い場合や、
+    カーネルが必要な操作に対応していない場合は available が False になる。
+    """
+
+    def __init__(self, entries: int = 8):
+        self._entries = entries
+        self._local = threading.local()
+        self.available = _uring_supported()
+
+    def _get_ring(self):
+        """呼び出し元スレッドのリングを取得（初回のみ作成）"""
+        ring = getattr(self._local, 'ring', None)
+        if ring is None:
+            ring = liburing.Ring()
+            liburing.io_uring_queue_init(self._entries, ring)
+            self._local.ring = ring
+            self._local.cqe = liburing.Cqe()
+        return ring, self._local.cqe
+
+    def write_and_rename(self, fd: int, data: bytes, temp_path: str, path: str) -> None:
+        """
+        fdへdataを書き込み、完了後にtemp_pathをpathへリネームする
+
+        Raises:
+            OSError: いずれかの操作が失敗した場合
+        """
+        ring, cqe = self._get_ring()
+        _prep_write_and_rename(ring, fd, data, temp_path, path)
+        liburing.io_uring_submit(ring)
+
+        error = None
+        for _ in range(2):
+            liburing.io_uring_wait_cqe(ring, cqe)
+            entry = cqe[0]
+            try:
+                result = _completion_error(entry, len(data) if entry.user_data == 0 else None)
+                error = error or result
+            finally:
+                liburing.io_uring_cqe_seen(ring, entry)
+
+        if error is not None:
+            raise error
+
+    def close(self) -> None:
+        """呼び出し元スレッドのリングを解放"""
+        ring = getattr(self._local, 'ring', None)
+        if ring is not None:
+            liburing.io_uring_queue_exit(ring)
+            self._local.ring = None
+
+@dataclass
+class UringOp:
+    """バッチエンジンに投入する書き込み＋リネーム操作（fdは完了後にエンジンが閉じる）"""
+    fd: int
+    data: bytes
+    temp_path: str
+    path: str
+    callback: Callable[[Optional[OSError]], None]
+
+class IoUringBatchEngine:
+    """
+    複数の書き込み＋リネーム操作を1つのリングでまとめて投入するエンジン
+
+    デーモンスレッドがキューから最大max_batch件の操作を取り出し、
+    1回のio_uring_submitで投入してから完了を待ち、各操作のコールバックを呼ぶ。
+    """
+
+    def __init__(self, entries: int = 1024, max_batch: int = 64):
+        # 1操作あたり2つのSQEを使う
+        self._max_batch = min(max_batch, entries // 2)
+        self._ring = liburing.Ring()
+        liburing.io_uring_queue_init(entries, self._ring)
+        self._cqe = liburing.Cqe()
+        self._queue: 'queue.Queue[Optional[UringOp]]' = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='io-uring-batch', daemon=True)
+        self._thread.start()
+
+    def submit(self, op: UringOp) -> None:
+        """操作をキューに追加"""
+        self._queue.put(op)
+
+    async def write_and_rename(self, fd: int, data: bytes, temp_path: str, path: str) -> None:
+        """
+        fdへdataを書き込み、完了後にtemp_pathをpathへリネームする（完了まで待機）
+
+        fdの所有権はエンジンに移り、操作の完了後に閉じられる。
+
+        Raises:
+            OSError: いずれかの操作が失敗した場合
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def _set_result(error: Optional[OSError]) -> None:
+            if not future.done():
+                if error is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(error)
+
+        self.submit(UringOp(fd, data, temp_path, path,
+                            lambda error: loop.call_soon_threadsafe(_set_result, error)))
+        await future
+
+    def _run(self) -> None:
+        """キューの操作をバッチ単位で投入・完了待ちするループ"""
+        while True:
+            op = self._queue.get()
+            if op is None:
+                break
+            ops = [op]
+            while len(ops) < self._max_batch:
+                try:
+                    op = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if op is None:
+                    self._queue.put(None)
+                    break
+                ops.append(op)
+
+            errors: List[Optional[OSError]] = [None] * len(ops)
+            try:
+                for i, op in enumerate(ops):
+                    _prep_write_and_rename(self._ring, op.fd, op.data, op.temp_path, op.path, i * 2)
+                liburing.io_uring_submit(self._ring)
+
+                for _ in range(len(ops) * 2):
+                    liburing.io_uring_wait_cqe(self._ring, self._cqe)
+                    entry = self._cqe[0]
+                    try:
+                        index, step = divmod(entry.user_data, 2)
+                        error = _completion_error(entry, len(ops[index].data) if step == 0 else None)
+                        errors[index] = errors[index] or error
+                    finally:
+                        liburing.io_uring_cqe_seen(self._ring, entry)
+            except Exception as e:
+                logger.error(f"io_uringバッチ処理エラー: {str(e)}")
+                errors = [error or OSError(errno.EIO, str(e)) for error in errors]
+
+            for op, error in zip(ops, errors):
+                try:
+                    os.close(op.fd)
+                    op.callback(error)
+                except Exception as e:
+                    logger.error(f"io_uring完了通知エラー: {str(e)}")
+
+        liburing.io_uring_queue_exit(self._ring)
+
+    def close(self) -> None:
+        """キュー内の操作を処理し終えてからエンジンを停止"""
+        self._queue.put(None)
+        self._thread.join()
+
+_batch_engine: Optional[IoUringBatchEngine] = None
+_batch_engine_lock = threading.Lock()
+
+def get_batch_engine() -> Optional[IoUringBatchEngine]:
+    """共有のio_uringバッチエンジンを取得（io_uringが使えない環境ではNone）"""
+    global _batch_engine
+    if _batch_engine is None and _uring_supported():
+        with _batch_engine_lock:
+            if _batch_engine is None:
+                try:
+                    _batch_engine = IoUringBatchEngine()
+                except Exception as e:
+                    logger.warning(f"io_uringバッチエンジンを初期化できません: {str(e)}")
+                    return None
+    return _batch_engine
+
+class _PathLock:
+    """パスごとのプロセス内ロック（WeakValueDictionaryで管理するためのラッパー）"""
+
+    __slots__ = ('lock', '__weakref__')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+
+_path_locks: 'weakref.WeakValueDictionary[str, _PathLock]' = weakref.WeakValueDictionary()
+_path_locks_guard = threading.Lock()
+
+def _get_path_lock(path: str) -> _PathLock:
+    """パスに対応するプロセス内ロックを取得（使われなくなったロックは自動的に破棄される）"""
+    key = os.path.normcase(os.path.abspath(path))
+    with _path_locks_guard:
+        entry = _path_locks.get(key)
+        if entry is None:
+            entry = _path_locks[key] = _PathLock()
+        return entry
+
 class FileManager:
     """安全なファイル操作を提供するクラス"""
 
+    # ファイル名に使えない文字を'_'に置き換える変換表
+    _INVALID_CHAR_TABLE = str.maketrans({char: '_' for char in '<>:"/\\|?*'})
+
     def __init__(self):
         self.settings = Settings()
         self._temp_files: List[str] = []
         self._open_files: Dict[str, Union[TextIO, BinaryIO]] = {}
         self._process = psutil.Process()
         self._is_windows = platform.system().lower() == 'windows'
+        self._hash_chunk_size = self.settings.RESOURCE_MANAGEMENT['storage']['hash_chunk_size']
+        self._uring = UringWriter() if self.settings.RESOURCE_MANAGEMENT['storage']['use_io_uring'] else None
+        self._use_tmpfile = _O_TMPFILE is not None
+        self._reflink_unsupported: Set[int] = set()  # reflinkに未対応のデバイス
+        self._cross_process_locks = self.settings.RESOURCE_MANAGEMENT['storage']['cross_process_locks']
+        # safe_write_asyncで書き込み中（まだ存在しない）のパス
+        self._pending_paths: Set[str] = set()
+        # リソースチェックの結果キャッシュ（計測時刻, 値）
+        self._memory_check: Tuple[float, bool] = (float('-inf'), True)
+        self._disk_free: Dict[str, Tuple[float, int]] = {}
 
     def _check_memory_usage(self) -> bool:
-        """メモリ使用量をチェック"""
+        """メモリ使用量をチェック（_RESOURCE_CHECK_TTL秒間は前回の結果を使う）"""
+        now = time.monotonic()
+        checked_at, ok = self._memory_check
+        if now - checked_at <= _RESOURCE_CHECK_TTL:
+            return ok
         memory_info = self._process.memory_info()
         total_memory = memory_info.rss + memory_info.vms
-        return total_memory < self.settings.RESOURCE_MANAGEMENT['memory']['heap_size']
+        ok = total_memory < self.settings.RESOURCE_MANAGEMENT['memory']['heap_size']
+        self._memory_check = (now, ok)
+        return ok
 
     def _check_disk_space(self, required_bytes: int, path: str = None) -> bool:
-        """ディスク容量をチェック"""
+        """ディスク容量をチェック（_RESOURCE_CHECK_TTL秒間は前回の空き容量を使う）"""
         if path is None:
             path = self.settings.SAVE_CONFIG['default_dir']
-        disk_usage = shutil.disk_usage(path)
-        return disk_usage.free > required_bytes
+        # 書き込み先のファイルはまだ存在しないことがあるため、ディレクトリ単位で調べる
+        directory = path if os.path.isdir(path) else os.path.dirname(os.path.abspath(path))
+
+        now = time.monotonic()
+        checked_at, free = self._disk_free.get(directory, (float('-inf'), 0))
+        if now - checked_at > _RESOURCE_CHECK_TTL:
+            checked_at, free = now, shutil.disk_usage(directory).free
+        if free <= required_bytes:
+            self._disk_free[directory] = (checked_at, free)
+            return False
+        # キャッシュ期間中の後続の書き込みのために、確保した分を差し引いておく
+        self._disk_free[directory] = (checked_at, free - required_bytes)
+        return True
 
     def _sanitize_filename(self, filename: str) -> str:
         """ファイル名を安全な形式に変換"""
-        # 不正な文字を除去
-        invalid_chars = '<>:"/\\|?*'
-        for char in invalid_chars:
-            filename = filename.replace(char, '_')
+        # 不正な文字を除去（変換表で一度に置き換える）
+        filename = filename.translate(self._INVALID_CHAR_TABLE)
         
         # ファイル名の長さを制限
         name, ext = os.path.splitext(filename)
         if len(name) > 200:  # 適度な長さに制限
-            name = name[:200]
-        return name + ext
+            return name[:200] + ext
+        return filename
 
     def _get_unique_path(self, path: str) -> str:
         """重複しないファイルパスを生成"""
-        if not os.path.exists(path):
+        if not os.path.exists(path) and path not in self._pending_paths:
             return path
             
         directory = os.path.dirname(path)
         name, ext = os.path.splitext(os.path.basename(path))
-        counter = 1
-        
-        while True:
-            new_path = os.path.join(directory, f"{name}_{counter}{ext}")
-            if not os.path.exists(new_path):
-                return new_path
-            counter += 1
+
+        # 候補ごとにstatせず、ディレクトリを一度だけ走査して既存の名前と照合する
+        with os.scandir(directory or '.') as it:
+            existing = {entry.name for entry in it}
+        existing.update(
+            os.path.basename(pending) for pending in self._pending_paths
+            if os.path.dirname(pending) == directory
+        )
+
+        pattern = f"{name}_{{}}{ext}"
+        counter = next(i for i in itertools.count(1) if pattern.format(i) not in existing)
+        return os.path.join(directory, pattern.format(counter))
 
     @contextmanager
     def _file_lock(self, path: str):
-        """クロスプラットフォーム対応のファイルロックを提供するコンテキストマネージャ"""
+        """
+        クロスプラットフォーム対応のファイルロックを提供するコンテキストマネージャ
+
+        cross_process_locks が無効な場合は、ロックファイルを作らずにプロセス内の
+        パスごとのロックを使う（他プロセスとの排他は行わない）。
+        """
+        if not self._cross_process_locks:
+            entry = _get_path_lock(path)
+            if not entry.lock.acquire(blocking=False):
+                raise IOError("ファイルは他の処理によってロックされています")
+            try:
+                yield
+            finally:
+                entry.lock.release()
+            return
+
         lock_path = f"{path}.lock"
         lock_file = None
         
@@ -114,6 +455,48 @@ class FileManager:
                 except OSError:
                     pass
 
+    @contextmanager
+    def _backup_existing(self, path: str):
+        """
+        既存ファイルがあればバックアップを取り、ブロック内の置き換えが終わるまでロックする
+
+        新規作成時は一時ファイルからのリネーム（またはリンク）自体がアトミックなため
+        ロックしない。書き込み中の読み込みで一貫性が必要な場合は呼び出し側で直列化すること。
+        """
+        if not os.path.exists(path):
+            yield
+            return
+
+        with self._file_lock(path):
+            if os.path.exists(path):
+                backup_path = self._get_backup_path(path)
+                self._copy_for_backup(path, backup_path)
+            yield
+
+    def _copy_for_backup(self, path: str, backup_path: str) -> None:
+        """
+        バックアップ用にファイルを複製
+
+        Btrfs/XFSなどreflink（FICLONE）に対応したファイルシステムでは、
+        データをコピーせずに共有する複製を作成する。未対応の場合はshutil.copy2で複製する。
+        """
+        if fcntl is not None:
+            with open(path, 'rb') as src:
+                device = os.fstat(src.fileno()).st_dev
+                if device not in self._reflink_unsupported:
+                    try:
+                        with open(backup_path, 'wb') as dst:
+                            fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+                        shutil.copystat(path, backup_path)
+                        return
+                    except OSError as e:
+                        if e.errno not in _REFLINK_UNSUPPORTED_ERRNOS:
+                            raise
+                        # 以降、同じデバイス上のファイルは通常のコピーで複製する
+                        self._reflink_unsupported.add(device)
+
+        shutil.copy2(path, backup_path)
+
     def validate_path(self, path: str) -> bool:
         """パスの検証"""
         try:
@@ -142,6 +525,184 @@ class FileManager:
     def safe_write(self, path: str, content: Union[str, bytes],
                   mode: str = 'w', encoding: Optional[str] = 'utf-8') -> bool:
         """安全なファイル書き込み"""
+        if not self._check_write(path, content):
+            return False
+
+        try:
+            data = self._get_uring_payload(content, mode, encoding)
+            # 新規作成の場合は名前のない一時ファイルに書き込んでからリンクする
+            if data is None and not os.path.exists(path):
+                try:
+                    if self._write_unnamed(path, content, mode, encoding):
+                        return True
+                except FileExistsError:
+                    pass  # 他の書き込みが先に作成した場合は置き換えの経路で書き込む
+
+            # 一時ファイルを使用して安全に書き込み
+            temp_fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            self._temp_files.append(temp_path)
+
+            # バックアップやロックの取得に失敗した場合も、fdと一時ファイルを残さない
+            completed = False
+            try:
+                if data is None:
+                    with os.fdopen(temp_fd, mode, encoding=None if 'b' in mode else encoding) as f:
+                        f.write(content)
+
+                with self._backup_existing(path):
+                    if data is None:
+                        # 一時ファイルを目的のパスに置き換え（同じディレクトリ内なのでアトミックなリネームになる）
+                        os.replace(temp_path, path)
+                    else:
+                        # 書き込みとリネームをio_uringでまとめて実行
+                        self._uring.write_and_rename(temp_fd, data, temp_path, path)
+                completed = True
+                self._temp_files.remove(temp_path)
+                return True
+            finally:
+                if data is not None:
+                    os.close(temp_fd)
+                if not completed:
+                    self._discard_temp_file(temp_path)
+                
+        except Exception as e:
+            logger.error(f"ファイル書き込みエラー: {str(e)}")
+            return False
+
+    def _write_unnamed(self, path: str, content: Union[str, bytes], mode: str,
+                       encoding: Optional[str]) -> bool:
+        """
+        O_TMPFILEで作成した名前のない一時ファイルに書き込み、pathにリンクする
+
+        一時ファイルはディレクトリに現れないため、中断しても残骸が残らない。
+        O_TMPFILEや/proc経由のリンクに対応していない環境ではFalseを返し、
+        以降はこの経路を使わない。
+        """
+        if not self._use_tmpfile:
+            return False
+
+        try:
+            fd = os.open(os.path.dirname(path) or '.', _O_TMPFILE | os.O_WRONLY | os.O_CLOEXEC, 0o600)
+        except OSError as e:
+            if e.errno not in _TMPFILE_UNSUPPORTED_ERRNOS:
+                raise
+            self._use_tmpfile = False
+            return False
+
+        with os.fdopen(fd, mode, encoding=None if 'b' in mode else encoding) as f:
+            f.write(content)
+            f.flush()
+            try:
+                os.link(f"/proc/self/fd/{fd}", path)
+            except OSError as e:
+                if e.errno not in _TMPFILE_UNSUPPORTED_ERRNOS:
+                    raise
+                self._use_tmpfile = False
+                return False
+        return True
+
+    async def safe_write_async(self, path: str, content: Union[str, bytes],
+                               mode: str = 'w', encoding: Optional[str] = 'utf-8') -> bool:
+        """
+        safe_writeの非同期版
+
+        io_uringが使える場合は共有のバッチエンジンに書き込みとリネームを投入し、
+        他の並行書き込みとまとめて処理させる（事前のチェック・一時ファイルの作成・
+        バックアップとロックの解放はスレッドで行う）。使えない場合はsafe_writeを
+        スレッドプールで実行する。いずれの場合もイベントループをブロックしない。
+        """
+        self._pending_paths.add(path)
+        try:
+            engine = get_batch_engine() if self._uring is not None else None
+            data = self._get_uring_payload(content, mode, encoding) if engine is not None else None
+            if data is None:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(None, self.safe_write, path, content, mode, encoding)
+            return await self._uring_write_async(engine, path, content, data)
+        finally:
+            self._pending_paths.discard(path)
+
+    async def _uring_write_async(self, engine: IoUringBatchEngine, path: str,
+                                 content: Union[str, bytes], data: bytes) -> bool:
+        """バッチエンジン経由で一時ファイルへの書き込みとリネームを行う"""
+        # チェック・一時ファイルの作成・バックアップはファイルシステムにアクセスするため
+        # スレッドで行う。待機中にキャンセルされてもスレッド側の準備は完了するため、
+        # その結果は後片付けしてから破棄する
+        prepare = asyncio.ensure_future(
+            asyncio.to_thread(self._prepare_uring_write, path, content)
+        )
+        try:
+            prepared = await asyncio.shield(prepare)
+        except asyncio.CancelledError:
+            prepare.add_done_callback(self._abandon_prepared_write)
+            raise
+        except Exception as e:
+            logger.error(f"ファイル書き込みエラー: {str(e)}")
+            return False
+        if prepared is None:
+            return False
+
+        temp_fd, temp_path, backup = prepared
+        failed = False
+        try:
+            # 一時ファイルのfdは操作の完了後にエンジンが閉じる
+            await engine.write_and_rename(temp_fd, data, temp_path, path)
+            self._temp_files.remove(temp_path)
+            return True
+
+        except Exception as e:
+            failed = True
+            logger.error(f"ファイル書き込みエラー: {str(e)}")
+            return False
+        finally:
+            # ロックの解放（ロックファイルの削除を含む）もスレッドで行う
+            await asyncio.to_thread(self._finish_uring_write, temp_path, backup, failed)
+
+    def _prepare_uring_write(self, path: str, content: Union[str, bytes]
+                             ) -> Optional[Tuple[int, str, ExitStack]]:
+        """
+        io_uringでの書き込み前の準備（チェック・一時ファイルの作成・バックアップとロック）
+
+        Returns:
+            (一時ファイルのfd, 一時ファイルのパス, ロックを保持したExitStack)。
+            チェックに失敗した場合はNone
+        """
+        if not self._check_write(path, content):
+            return None
+
+        temp_fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        self._temp_files.append(temp_path)
+
+        backup = ExitStack()
+        try:
+            backup.enter_context(self._backup_existing(path))
+        except BaseException:
+            os.close(temp_fd)
+            self._discard_temp_file(temp_path)
+            raise
+        return temp_fd, temp_path, backup
+
+    def _finish_uring_write(self, temp_path: str, backup: ExitStack, failed: bool) -> None:
+        """io_uringでの書き込み後にロックを解放し、失敗時は一時ファイルを削除"""
+        try:
+            if failed:
+                self._discard_temp_file(temp_path)
+        finally:
+            backup.close()
+
+    def _abandon_prepared_write(self, prepare: asyncio.Future) -> None:
+        """キャンセルで使われなかった準備結果（fd・一時ファイル・ロック）を解放"""
+        if prepare.cancelled() or prepare.exception() is not None:
+            return
+        prepared = prepare.result()
+        if prepared is None:
+            return
+        temp_fd, temp_path, backup = prepared
+        os.close(temp_fd)
+        self._finish_uring_write(temp_path, backup, failed=True)
+
+    def _check_write(self, path: str, content: Union[str, bytes]) -> bool:
+        """書き込み前のパス・メモリ・ディスク容量のチェック"""
         if not self.validate_path(path):
             return False
 
@@ -149,33 +710,74 @@ class FileManager:
             logger.error("メモリ使用量が制限を超えています")
             return False
 
-        content_size = len(content.encode()) if isinstance(content, str) else len(content)
-        if not self._check_disk_space(content_size, path):
+        if isinstance(content, str):
+            # UTF-8は1文字最大4バイトなので、まず上限の見積もりで判定し、
+            # 足りない場合のみ実際にエンコードした正確なサイズで判定し直す
+            has_space = (self._check_disk_space(len(content) * 4, path)
+                         or self._check_disk_space(len(content.encode()), path))
+        else:
+            has_space = self._check_disk_space(len(content), path)
+        if not has_space:
             logger.error("十分なディスク容量がありません")
             return False
 
-        # 一時ファイルを使用して安全に書き込み
+        return True
+
+    def _get_uring_payload(self, content: Union[str, bytes], mode: str,
+                           encoding: Optional[str]) -> Optional[bytes]:
+        """io_uring経由で書き込むバイト列を返す（従来の経路で書き込む場合はNone）"""
+        if self._uring is None or not self._uring.available:
+            return None
+        if isinstance(content, str):
+            if mode != 'w' or encoding is None:
+                return None
+            content = content.encode(encoding)
+        elif mode != 'wb' or not isinstance(content, (bytes, bytearray)):
+            return None
+        return content if len(content) <= _URING_MAX_WRITE else None
+
+    @contextmanager
+    def safe_open(self, path: str, mode: str = 'w', encoding: Optional[str] = 'utf-8',
+                  buffer_size: int = 1024 * 1024):
+        """
+        一時ファイル経由で安全に書き込むファイルオブジェクトを提供
+
+        ブロックを正常に抜けた時点で一時ファイルを目的のパスに移動する。
+        大きなデータを文字列に展開せず、直接ストリームに書き出す用途向け。
+
+        Args:
+            path: 書き込み先のパス
+            mode: 'w'（テキスト）または'wb'（バイナリ）
+            encoding: テキストモード時のエンコーディング
+            buffer_size: 書き込みバッファのサイズ（バイト）
+
+        Yields:
+            書き込み用のファイルオブジェクト
+        """
+        if not self.validate_path(path):
+            raise IOError(f"無効なパス: {path}")
+
+        if not self._check_memory_usage():
+            raise MemoryError("メモリ使用量が制限を超えています")
+
         temp_fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
         self._temp_files.append(temp_path)
-        
+
         try:
-            with self._file_lock(path):
-                with os.fdopen(temp_fd, mode, encoding=encoding) as f:
-                    f.write(content)
-                
-                # 既存ファイルのバックアップ（存在する場合）
-                if os.path.exists(path):
-                    backup_path = self._get_backup_path(path)
-                    shutil.copy2(path, backup_path)
-                
-                # 一時ファイルを目的のパスに移動
-                shutil.move(temp_path, path)
+            stream = io.BufferedWriter(io.FileIO(temp_fd, 'w'), buffer_size=buffer_size)
+            if 'b' not in mode:
+                stream = io.TextIOWrapper(stream, encoding=encoding)
+            with stream:
+                yield stream
+
+            with self._backup_existing(path):
+                # 一時ファイルを目的のパスに置き換え（同じディレクトリ内なのでアトミックなリネームになる）
+                os.replace(temp_path, path)
                 self._temp_files.remove(temp_path)
-                return True
-                
+
         except Exception as e:
             logger.error(f"ファイル書き込みエラー: {str(e)}")
-            return False
+            raise
 
     def safe_read(self, path: str, mode: str = 'r',
                  encoding: Optional[str] = 'utf-8') -> Optional[Union[str, bytes]]:
@@ -187,10 +789,11 @@ class FileManager:
             logger.error(f"ファイルが存在しません: {path}")
             return None
 
+        # 書き込みは一時ファイルからのリネームで置き換えるため、ロックしなくても
+        # 読み込み中に内容が混ざることはない（旧・新いずれかの内容が読める）
         try:
-            with self._file_lock(path):
-                with open(path, mode, encoding=encoding) as f:
-                    return f.read()
+            with open(path, mode, encoding=encoding) as f:
+                return f.read()
                     
         except Exception as e:
             logger.error(f"ファイル読み込みエラー: {str(e)}")
@@ -220,6 +823,17 @@ class FileManager:
             logger.error(f"一時ファイル作成エラー: {str(e)}")
             return None
 
+    def _discard_temp_file(self, temp_path: str) -> None:
+        """書き込みに失敗した一時ファイルを削除"""
+        try:
+            os.remove(temp_path)
+        except FileNotFoundError:
+            pass  # リネーム済み、または作成前に失敗した
+        except OSError as e:
+            logger.error(f"一時ファイル削除エラー: {str(e)}")
+            return
+        self._temp_files.remove(temp_path)
+
     def cleanup_temp_files(self):
         """一時ファイルを削除"""
         for temp_path in self._temp_files[:]:
@@ -230,21 +844,61 @@ class FileManager:
             except Exception as e:
                 logger.error(f"一時ファイル削除エラー: {str(e)}")
 
-    def get_file_hash(self, path: str) -> Optional[str]:
-        """ファイルのハッシュ値を計算"""
+    def get_file_hash(self, path: str, use_cryptographic: bool = False) -> Optional[str]:
+        """
+        ファイルのハッシュ値を計算
+
+        重複判定などの用途ではBLAKE3（導入されている場合）を使う。
+        暗号学的な強度が必要な場合は use_cryptographic=True でSHA-256を使う。
+
+        Args:
+            path: 対象ファイルのパス
+            use_cryptographic: SHA-256で計算するかどうか
+
+        Returns:
+            16進数のハッシュ値。失敗時はNone
+        """
         if not os.path.exists(path):
             return None
 
         try:
-            with open(path, 'rb') as f:
-                return hashlib.sha256(f.read()).hexdigest()
+            if blake3 is not None and not use_cryptographic:
+                # ファイルをmmapし、内部のスレッドプールで並列にハッシュ計算する
+                hasher = blake3(max_threads=blake3.AUTO)
+                hasher.update_mmap(path)
+                return hasher.hexdigest()
+
+            # ファイル全体を読み込まず、再利用するバッファにチャンク単位で読みながら計算する
+            digest = hashlib.sha256()
+            with open(path, 'rb', buffering=0) as f:
+                # 読み込み単位はファイルシステムのブロックサイズの倍数にそろえる
+                block_size = os.fstat(f.fileno()).st_blksize or 4096
+                chunk_size = max(block_size, self._hash_chunk_size // block_size * block_size)
+                buffer = bytearray(chunk_size)
+                view = memoryview(buffer)
+                while True:
+                    n = f.readinto(buffer)
+                    if not n:
+                        break
+                    digest.update(view[:n])
+            return digest.hexdigest()
         except Exception as e:
             logger.error(f"ハッシュ計算エラー: {str(e)}")
             return None
 
+    async def get_file_hash_async(self, path: str, use_cryptographic: bool = False) -> Optional[str]:
+        """
+        get_file_hashの非同期版
+
+        読み込みとハッシュ計算を別スレッドで行い、イベントループをブロックしない。
+        """
+        return await asyncio.to_thread(self.get_file_hash, path, use_cryptographic)
+
     def __del__(self):
         """デストラクタ: 残っている一時ファイルを削除"""
         self.cleanup_temp_files()
+        if self._uring is not None and self._uring.available:
+            self._uring.close()
 
 # シングルトンインスタンスを作成
 file_manager = FileManager()
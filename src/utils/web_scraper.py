@@ -5,20 +5,36 @@ import asyncio
 import aiohttp
 import logging
 from bs4 import BeautifulSoup
-from typing import Optional, Dict, Union, Tuple, List, Set
+from typing import Optional, Dict, Union, Tuple, List, Set, Deque
 from urllib.parse import urljoin, urlparse
 import time
+import hashlib
 import mimetypes
 import os
+from collections import deque
 import psutil
 from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
+from yarl import URL
 
 from config.settings import Settings
 
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:  # lxml未導入時は標準のパーサを使用
+    HTML_PARSER = 'html.parser'
+
 logger = logging.getLogger(__name__)
 
+# メモリ・CPU使用率チェックの結果を再利用する期間（秒）
+_RESOURCE_CHECK_TTL = 0.1
+
+# URL検証結果のキャッシュ件数
+_URL_CACHE_SIZE = 65536
+
 @dataclass
 class DownloadResult:
     """ダウンロード結果を格納するデータクラス"""
@@ -36,68 +52,120 @@ class ResourceLimiter:
     def __init__(self, settings: Settings):
         self.settings = settings
         self.process = psutil.Process()
-        self._bandwidth_window: List[Tuple[float, int]] = []  # (timestamp, bytes)
+        self._bandwidth_window: Deque[Tuple[float, int]] = deque()  # (timestamp, bytes)
+        self._bandwidth_total = 0  # ウィンドウ内のバイト数の合計
         self._active_connections = 0
         self._lock = asyncio.Lock()
+        # チェック結果のキャッシュ（計測時刻, 結果）
+        self._memory_check: Tuple[float, bool] = (float('-inf'), True)
+        self._cpu_check: Tuple[float, bool] = (float('-inf'), True)
 
     async def check_memory_usage(self) -> bool:
-        """メモリ使用量をチェック"""
+        """メモリ使用量をチェック（_RESOURCE_CHECK_TTL秒間は前回の結果を使う）"""
+        now = time.monotonic()
+        checked_at, ok = self._memory_check
+        if now - checked_at <= _RESOURCE_CHECK_TTL:
+            return ok
         memory_info = self.process.memory_info()
         total_memory = memory_info.rss + memory_info.vms
-        return total_memory < self.settings.RESOURCE_MANAGEMENT['memory']['heap_size']
+        ok = total_memory < self.settings.RESOURCE_MANAGEMENT['memory']['heap_size']
+        self._memory_check = (now, ok)
+        return ok
 
     async def check_cpu_usage(self) -> bool:
-        """CPU使用率をチェック"""
-        cpu_percent = self.process.cpu_percent()
-        return cpu_percent < self.settings.PERFORMANCE['site_saving']['processing']['max_cpu_usage']
+        """CPU使用率をチェック（_RESOURCE_CHECK_TTL秒間は前回の結果を使う）"""
+        now = time.monotonic()
+        checked_at, ok = self._cpu_check
+        if now - checked_at <= _RESOURCE_CHECK_TTL:
+            return ok
+        # interval=Noneでは前回呼び出しからの差分で使用率を求めるため、ブロックしない
+        cpu_percent = self.process.cpu_percent(interval=None)
+        ok = cpu_percent < self.settings.PERFORMANCE['site_saving']['processing']['max_cpu_usage']
+        self._cpu_check = (now, ok)
+        return ok
 
     async def check_and_update_bandwidth(self, bytes_count: int) -> bool:
         """帯域幅使用量をチェックと更新"""
-        async with self._lock:
-            current_time = time.time()
-            
-            # 1秒以上前のデータを削除
-            self._bandwidth_window = [
-                (ts, bs) for ts, bs in self._bandwidth_window
-                if current_time - ts <= 1.0
-            ]
-            
-            # 現在のデータを追加
-            self._bandwidth_window.append((current_time, bytes_count))
-            
-            # 現在の帯域幅を計算
-            total_bytes = sum(bs for _, bs in self._bandwidth_window)
-            return total_bytes <= self.settings.RESOURCE_MANAGEMENT['network']['max_bandwidth']
+        # 途中でawaitしないため、イベントループ上ではロックなしでも他の処理と交錯しない
+        current_time = time.time()
+        
+        # 現在のデータを追加
+        self._bandwidth_window.append((current_time, bytes_count))
+        self._bandwidth_total += bytes_count
+        
+        # 1秒以上前のデータを古い順に削除し、合計から差し引く
+        window = self._bandwidth_window
+        while current_time - window[0][0] > 1.0:
+            self._bandwidth_total -= window.popleft()[1]
+        
+        return self._bandwidth_total <= self.settings.RESOURCE_MANAGEMENT['network']['max_bandwidth']
 
-    async def acquire_connection(self) -> bool:
-        """接続スロットを確保"""
+    async def admit(self) -> Optional[str]:
+        """
+        取得を開始できるか判定し、開始できる場合は接続スロットを確保
+
+        接続数・メモリ・CPU使用率を1回のロック取得でまとめて判定する。
+        確保したスロットは release で解放すること。
+
+        Returns:
+            Optional[str]: 開始できない場合はその理由（"接続制限"/"リソース制限"）、開始できる場合はNone
+        """
         async with self._lock:
             if self._active_connections >= self.settings.RESOURCE_MANAGEMENT['network']['connection_limit']:
-                return False
+                return "接続制限"
+            if not (await self.check_memory_usage() and await self.check_cpu_usage()):
+                return "リソース制限"
             self._active_connections += 1
-            return True
+            return None
 
-    async def release_connection(self):
-        """接続スロットを解放"""
+    async def release(self):
+        """admitで確保した接続スロットを解放"""
         async with self._lock:
             self._active_connections = max(0, self._active_connections - 1)
 
 class WebScraper:
     """Web scraping utility class with concurrent download support"""
     
+    # 許可するContent-Type（前方一致）
+    _ALLOWED_CONTENT_TYPES = (
+        'text/',
+        'image/',
+        'video/',
+        'application/javascript',
+        'application/x-javascript',
+        'application/json',
+        'application/xml',
+        'application/css'
+    )
+
     def __init__(self):
         self.settings = Settings()
         self.resource_limiter = ResourceLimiter(self.settings)
         self._session: Optional[aiohttp.ClientSession] = None
-        self._downloaded_urls: Set[str] = set()
+        self._downloaded_urls: Set[bytes] = set()  # URLのダイジェスト（_url_key）
         self._download_semaphore = asyncio.Semaphore(
             self.settings.PERFORMANCE['site_saving']['download']['max_concurrent']
         )
+        # URL検証で参照する許可プロトコルは初期化時に取り出しておく
+        web_access = self.settings.SECURITY['web_access']
+        self._allowed_protocols = frozenset(web_access['protocols'])
+        self._warn_on_http = web_access['warn_on_http']
+        # 同じURLの検証を繰り返さないよう、結果をインスタンスごとにキャッシュする
+        self._is_valid_url = lru_cache(maxsize=_URL_CACHE_SIZE)(self._is_valid_url)
 
     async def _get_session(self) -> aiohttp.ClientSession:
         """セッションを取得（必要に応じて作成）"""
         if self._session is None or self._session.closed:
+            # DNS解決結果とアイドル接続を再利用し、同一ホストへの取得でハンドシェイクを省く
+            network = self.settings.RESOURCE_MANAGEMENT['network']
+            connector = aiohttp.TCPConnector(
+                limit=network['connection_limit'],
+                use_dns_cache=True,
+                ttl_dns_cache=network['dns_cache_ttl'],
+                keepalive_timeout=network['keepalive_timeout']
+            )
             self._session = aiohttp.ClientSession(
+                connector=connector,
                 headers={'User-Agent': self.settings.SCRAPING_CONFIG['user_agent']},
                 timeout=aiohttp.ClientTimeout(
                     total=self.settings.SCRAPING_CONFIG['timeout']
@@ -105,25 +173,26 @@ class WebScraper:
             )
         return self._session
 
-    async def _check_resources(self) -> bool:
-        """リソース使用量をチェック"""
-        checks = await asyncio.gather(
-            self.resource_limiter.check_memory_usage(),
-            self.resource_limiter.check_cpu_usage()
-        )
-        return all(checks)
+    async def open_session(self):
+        """HTTPセッションを事前に作成"""
+        await self._get_session()
+
+    @staticmethod
+    def _url_key(url: str) -> bytes:
+        """重複チェック用のURLキー（URL文字列の代わりに16バイトのダイジェストを保持する）"""
+        return hashlib.blake2b(url.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
 
     def _is_valid_url(self, url: str) -> Tuple[bool, Optional[str]]:
-        """URLの検証"""
+        """URLの検証（結果は__init__でキャッシュされる）"""
         try:
-            allowed, warn = self.settings.is_allowed_protocol(url)
-            if not allowed:
+            parsed = URL(url)
+            if parsed.scheme not in self._allowed_protocols:
                 return False, "不正なプロトコル"
             
-            parsed = urlparse(url)
-            if not all([parsed.scheme, parsed.netloc]):
+            if not parsed.host:
                 return False, "不正なURL形式"
                 
+            warn = parsed.scheme == 'http' and self._warn_on_http
             return True, "警告: HTTPプロトコル使用" if warn else None
             
         except Exception:
@@ -131,54 +200,68 @@ class WebScraper:
 
     async def get_page(self, url: str, params: Optional[Dict] = None) -> Optional[BeautifulSoup]:
         """ページを非同期で取得してパース"""
-        if url in self._downloaded_urls:
+        soup, _ = await self.fetch_page(url, params)
+        return soup
+
+    async def fetch_page(
+        self,
+        url: str,
+        params: Optional[Dict] = None
+    ) -> Tuple[Optional[BeautifulSoup], Optional[str]]:
+        """
+        ページを非同期で取得し、パース結果と取得したHTMLを返す
+        
+        Returns:
+            Tuple[BeautifulSoup, str]: (パース結果, HTML文字列)。失敗時は(None, None)
+        """
+        url_key = self._url_key(url)
+        if url_key in self._downloaded_urls:
             logger.warning(f"重複URL: {url}")
-            return None
+            return None, None
             
         valid, message = self._is_valid_url(url)
         if not valid:
             logger.error(f"無効なURL ({url}): {message}")
-            return None
+            return None, None
         elif message:
             logger.warning(message)
 
-        try:
-            if not await self.resource_limiter.acquire_connection():
-                logger.warning("接続制限に達しました")
-                return None
+        reason = await self.resource_limiter.admit()
+        if reason is not None:
+            logger.warning(f"{reason}に達しました")
+            return None, None
 
+        try:
             async with self._download_semaphore:
-                if not await self._check_resources():
-                    logger.error("リソース制限に達しました")
-                    return None
-
                 session = await self._get_session()
                 start_time = time.time()
                 
                 async with session.get(url, params=params) as response:
                     response.raise_for_status()
-                    content = await response.text()
+                    body = await response.read()
+                    content = body.decode(response.get_encoding())
                     
                     # 帯域幅チェック
-                    if not await self.resource_limiter.check_and_update_bandwidth(len(content.encode())):
+                    if not await self.resource_limiter.check_and_update_bandwidth(len(body)):
                         logger.warning("帯域幅制限に達しました")
-                        return None
+                        return None, None
                     
-                    self._downloaded_urls.add(url)
-                    return BeautifulSoup(content, 'html.parser')
+                    self._downloaded_urls.add(url_key)
+                    return BeautifulSoup(content, HTML_PARSER), content
 
         except aiohttp.ClientError as e:
             logger.error(f"ページ取得エラー ({url}): {str(e)}")
-            return None
+            return None, None
         except Exception as e:
             logger.error(f"予期せぬエラー ({url}): {str(e)}")
-            return None
+            return None, None
         finally:
-            await self.resource_limiter.release_connection()
+            await self.resource_limiter.release()
 
     async def download_resource(self, url: str) -> DownloadResult:
         """リソースを非同期でダウンロード"""
-        if url in self._downloaded_urls:
+        url_key = self._url_key(url)
+        if url_key in self._downloaded_urls:
             return DownloadResult(url=url, success=False, error="重複URL")
 
         valid, message = self._is_valid_url(url)
@@ -187,14 +270,12 @@ class WebScraper:
         elif message:
             logger.warning(message)
 
-        try:
-            if not await self.resource_limiter.acquire_connection():
-                return DownloadResult(url=url, success=False, error="接続制限")
+        reason = await self.resource_limiter.admit()
+        if reason is not None:
+            return DownloadResult(url=url, success=False, error=reason)
 
+        try:
             async with self._download_semaphore:
-                if not await self._check_resources():
-                    return DownloadResult(url=url, success=False, error="リソース制限")
-
                 session = await self._get_session()
                 start_time = time.time()
                 
@@ -219,14 +300,24 @@ class WebScraper:
                             error="ファイルサイズ超過"
                         )
                     
-                    content = await response.read()
+                    # 本文をチャンク単位で読み込み、サイズと帯域幅の制限を逐次チェック
+                    max_size = self.settings.FILE_CONFIG['max_size']
+                    chunk_size = self.settings.PERFORMANCE['site_saving']['download']['chunk_size']
+                    buffer = bytearray()
+                    async for chunk in response.content.iter_chunked(chunk_size):
+                        if len(buffer) + len(chunk) > max_size:
+                            return DownloadResult(
+                                url=url,
+                                success=False,
+                                error="ファイルサイズ超過"
+                            )
+                        if not await self.resource_limiter.check_and_update_bandwidth(len(chunk)):
+                            return DownloadResult(url=url, success=False, error="帯域幅制限")
+                        buffer.extend(chunk)
+                    content = bytes(buffer)
                     download_time = time.time() - start_time
                     
-                    # 帯域幅チェック
-                    if not await self.resource_limiter.check_and_update_bandwidth(len(content)):
-                        return DownloadResult(url=url, success=False, error="帯域幅制限")
-                    
-                    self._downloaded_urls.add(url)
+                    self._downloaded_urls.add(url_key)
                     return DownloadResult(
                         url=url,
                         success=True,
@@ -241,7 +332,7 @@ class WebScraper:
         except Exception as e:
             return DownloadResult(url=url, success=False, error=f"予期せぬエラー: {str(e)}")
         finally:
-            await self.resource_limiter.release_connection()
+            await self.resource_limiter.release()
 
     async def get_text_content(self, url: str) -> Optional[str]:
         """テキストコンテンツを非同期で取得"""
@@ -255,17 +346,8 @@ class WebScraper:
 
     def _is_allowed_content_type(self, content_type: str) -> bool:
         """Content-Typeが許可されているかチェック"""
-        allowed_types = [
-            'text/',
-            'image/',
-            'video/',
-            'application/javascript',
-            'application/x-javascript',
-            'application/json',
-            'application/xml',
-            'application/css'
-        ]
-        return any(allowed_type in content_type for allowed_type in allowed_types)
+        # パラメータ（; charset=... など）を除いたメディアタイプを前方一致で判定
+        return content_type.split(';', 1)[0].strip().startswith(self._ALLOWED_CONTENT_TYPES)
 
     async def close(self):
         """セッションをクローズ"""